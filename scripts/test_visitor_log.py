@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Check that visitor tracking stays bounded under spoofed X-Forwarded-For IPs."""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.app as app_module
+from src.app import app, tunnel_data, _new_visitor_log
+
+app.config['TESTING'] = True
+
+CAP = 50
+REQUESTS = CAP * 4
+
+# A small cap keeps the run short; the code reads VISITOR_LOG_MAX per visit
+app_module.VISITOR_LOG_MAX = CAP
+tunnel_data['visitors'] = _new_visitor_log()
+
+with app.test_client() as client:
+    # track_visitor runs before the login check, so no login is needed
+    for i in range(REQUESTS):
+        client.get('/about', headers={'X-Forwarded-For': f'10.0.{i // 256}.{i % 256}'})
+    # A repeat visit moves an IP to the most recent end instead of adding one
+    client.get('/about', headers={'X-Forwarded-For': f'10.0.0.{REQUESTS - CAP}'})
+
+visitors = tunnel_data['visitors']
+by_ip = visitors['by_ip']
+checks = [
+    (f"by_ip capped at {CAP}", len(by_ip) == CAP, len(by_ip)),
+    ("oldest IPs evicted", '10.0.0.0' not in by_ip, list(by_ip)[:3]),
+    ("revisited IP is most recent", next(reversed(by_ip)) == f'10.0.0.{REQUESTS - CAP}', next(reversed(by_ip))),
+    ("revisited IP counted twice", by_ip[f'10.0.0.{REQUESTS - CAP}']['visit_count'] == 2,
+     by_ip[f'10.0.0.{REQUESTS - CAP}']['visit_count']),
+    ("total counts every visit", visitors['total'] == REQUESTS + 1, visitors['total']),
+]
+
+print("\n=== VISITOR LOG TEST RESULTS ===")
+for name, ok, actual in checks:
+    print(f"{'OK  ' if ok else 'FAIL'}  {name} (got {actual})")
+
+fails = [c for c in checks if not c[1]]
+print(f"\nTotal: {len(checks)}, OK: {len(checks) - len(fails)}, Failed: {len(fails)}")
+sys.exit(1 if fails else 0)
@@ -239,7 +239,7 @@ chown -R ${APP_USER}:${APP_USER} "$APP_DIR"
 chmod 700 certs/
 chmod 600 certs/key.pem
 chmod 600 .env
-chmod 600 auth.json 2>/dev/null || true
+chmod 600 auth.json auth_sessions.json auth_history.jsonl 2>/dev/null || true
 chmod 755 start.sh
 
 log_ok "File permissions secured"
@@ -23,8 +23,14 @@ import shutil
 import threading
 import subprocess
 import time
+import itertools
+import codecs
+from collections import deque, OrderedDict
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import wraps, lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
 
 from flask import (
     Flask, render_template, request, jsonify, send_file,
@@ -32,6 +38,11 @@ from flask import (
 )
 from werkzeug.utils import secure_filename
 
+try:
+    import orjson  # Optional: faster JSON for the polling endpoints
+except ImportError:
+    orjson = None
+
 # ---------- Internal imports (Fix #16: explicit, no wildcard) ----------
 from src.paths import ProjectPaths
 from src.logger import get_logger
@@ -42,10 +53,10 @@ from src.config import (
     DATABASE_PATH, LOG_LEVEL,
 )
 from src.database import (
-    init_database, get_db_connection, get_db,
+    init_database, get_db_connection, get_db, get_read_db,
     get_categories_tree, add_category,
     add_snapshot, add_snapshots_batch,
-    query_snapshots, query_snapshots_with_count, count_snapshots,
+    query_snapshots, query_snapshots_with_count, count_snapshots, iter_snapshots,
     get_snapshots_by_daily_time, get_snapshot_by_id,
     add_video_generation, get_database_stats,
     delete_snapshot, delete_category, delete_video, delete_multiple_snapshots,
@@ -58,7 +69,7 @@ from src.database import (
 from src.utils import (
     allowed_file, allowed_file_strict, generate_unique_filename, get_image_dimensions,
     parse_datetime, extract_datetime_from_filename, format_file_size,
-    compute_file_hash, compute_data_hash, STRICT_IMAGE_EXTENSIONS, MAX_UPLOAD_SIZE_BYTES,
+    compute_file_hash, compute_stream_hash, STRICT_IMAGE_EXTENSIONS, MAX_UPLOAD_SIZE_BYTES,
 )
 from src.video_generator import (
     create_timelapse_video, create_timelapse_with_timestamps,
@@ -126,8 +137,20 @@ try:
 except Exception as e:
     logger.warning(f"Failed to create directories: {e}")
 
+# ---------- Module paths (computed once at import) ----------
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+_REPO_DIR = os.path.dirname(_SRC_DIR)
+_LOCAL_CF = os.path.join(_SRC_DIR, 'cloudflared.exe' if os.name == 'nt' else 'cloudflared')
+_CERT_PATH = os.path.join(_REPO_DIR, 'certs', 'cert.pem')
+
+
+@lru_cache(maxsize=1)
+def _cert_exists():
+    """Whether the SSL cert is present (fixed once the server has started)."""
+    return os.path.exists(_CERT_PATH)
+
 # ---------- Flask app ----------
-_static_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+_static_dir = os.path.join(_REPO_DIR, 'static')
 app = Flask(__name__, template_folder=str(TEMPLATES_FOLDER), static_folder=_static_dir, static_url_path='/static')
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
@@ -139,6 +162,14 @@ else:
     app.secret_key = os.getenv('SECRET_KEY', None) or secrets.token_hex(32)
     logger.warning("Using auto-generated secret key. Set SECRET_KEY env var for production.")
 
+def fjson(obj, status=200):
+    """jsonify() for hot polling endpoints — encodes with orjson when installed."""
+    if orjson is None:
+        response = jsonify(obj)
+        response.status_code = status
+        return response
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
 @app.context_processor
 def inject_csrf_token():
     """Make csrf_token available in all templates."""
@@ -192,10 +223,24 @@ _job_results_lock = threading.Lock()
 video_job_results = {}
 
 _tunnel_lock = threading.Lock()
+VISITOR_LOG_MAX = 10000
+
+
+def _new_visitor_log():
+    """Bounded visitor log plus running counters so stats stay O(1).
+
+    by_ip holds each IP's first/last visit and visit count, most recently
+    seen IP last, so the per-IP summary never scans the log. IPs come from
+    the client-supplied X-Forwarded-For, so by_ip is capped like the log:
+    past VISITOR_LOG_MAX IPs the least recently seen one is dropped.
+    """
+    return {'log': deque(maxlen=VISITOR_LOG_MAX), 'by_ip': OrderedDict(), 'total': 0}
+
+
 tunnel_data = {
     'url': None,
     'set_at': None,
-    'visitors': [],
+    'visitors': _new_visitor_log(),
     'process': None,
     'status': 'stopped',
     'last_check': None,
@@ -246,9 +291,20 @@ def _tunnel_snapshot():
 
 def _tunnel_append_visitor(visitor_info):
     with _tunnel_lock:
-        tunnel_data['visitors'].append(visitor_info)
-        if len(tunnel_data['visitors']) > 100:
-            tunnel_data['visitors'] = tunnel_data['visitors'][-100:]
+        visitors = tunnel_data['visitors']
+        visitors['log'].append(visitor_info)
+        visitors['total'] += 1
+        ip = visitor_info['ip']
+        summary = visitors['by_ip'].get(ip)
+        if summary is None:
+            visitors['by_ip'][ip] = {'ip': ip, 'first_visit': visitor_info['time'],
+                                     'last_visit': visitor_info['time'], 'visit_count': 1}
+            while len(visitors['by_ip']) > VISITOR_LOG_MAX:
+                visitors['by_ip'].popitem(last=False)
+        else:
+            summary['last_visit'] = visitor_info['time']
+            summary['visit_count'] += 1
+            visitors['by_ip'].move_to_end(ip)
 
 # ---------- Initialize database ----------
 init_database()
@@ -271,15 +327,23 @@ def set_security_headers(response):
     return response
 
 
+def _client_ip():
+    """First hop of X-Forwarded-For (no list allocation), else remote_addr."""
+    visitor_ip = request.headers.get('X-Forwarded-For') or request.remote_addr
+    if visitor_ip:
+        head, sep, _ = visitor_ip.partition(',')
+        if sep:
+            visitor_ip = head.strip()
+    return visitor_ip
+
+
 @app.before_request
 def track_visitor():
     """Track visitors for each request (Fix #3: thread-safe)."""
     if request.path.startswith('/static') or request.path.startswith('/api/') or request.path.startswith('/snapshot/image'):
         return
 
-    visitor_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
-    if visitor_ip and ',' in visitor_ip:
-        visitor_ip = visitor_ip.split(',')[0].strip()
+    visitor_ip = _client_ip()
 
     visitor_info = {
         'ip': visitor_ip,
@@ -378,9 +442,7 @@ def upload():
             return jsonify({'success': False, 'error': f'File too large. Maximum size is {MAX_UPLOAD_SIZE_BYTES // (1024*1024)} MB'}), 400
 
         # Fix #1: Duplicate detection - compute hash from file content
-        file_data = file.read()
-        file.seek(0)
-        file_hash = compute_data_hash(file_data)
+        file_hash = compute_stream_hash(file.stream)
         existing = check_duplicate_hash(file_hash)
         if existing:
             return jsonify({
@@ -507,9 +569,7 @@ def api_upload():
             }), 400
 
         # Fix #1: Duplicate detection
-        file_data = file.read()
-        file.seek(0)
-        file_hash = compute_data_hash(file_data)
+        file_hash = compute_stream_hash(file.stream)
         existing = check_duplicate_hash(file_hash)
         if existing:
             return jsonify({
@@ -843,7 +903,8 @@ def _prepare_video_data(category_id, start_time, end_time, fps, show_timestamp,
     if start_dt and not end_dt:
         end_dt = start_dt.replace(hour=23, minute=59, second=59)
 
-    snapshots = query_snapshots(
+    # Rows are streamed straight into the frame list, never held as a list
+    snapshots = iter_snapshots(
         category_id=category_id,
         start_time=start_dt,
         end_time=end_dt,
@@ -852,12 +913,6 @@ def _prepare_video_data(category_id, start_time, end_time, fps, show_timestamp,
         camera_id=camera_id if camera_id else None,
     )
 
-    if not snapshots:
-        return None, None, None, start_dt, end_dt, 'No images found matching the specified criteria'
-
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_filename = f"{secure_filename(video_name or 'timelapse')}_{timestamp}.mp4"
-
     if show_timestamp:
         snapshot_data = [
             (_normalize_filepath(s['filepath'], UPLOAD_FOLDER), parse_datetime(s['capture_time']), f"ID: {s['id']}")
@@ -866,7 +921,13 @@ def _prepare_video_data(category_id, start_time, end_time, fps, show_timestamp,
     else:
         snapshot_data = [_normalize_filepath(s['filepath'], UPLOAD_FOLDER) for s in snapshots]
 
-    return snapshots, snapshot_data, output_filename, start_dt, end_dt, None
+    if not snapshot_data:
+        return None, None, None, start_dt, end_dt, 'No images found matching the specified criteria'
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_filename = f"{secure_filename(video_name or 'timelapse')}_{timestamp}.mp4"
+
+    return len(snapshot_data), snapshot_data, output_filename, start_dt, end_dt, None
 
 
 def _generate_video_sync(snapshot_data, output_filename, fps, show_timestamp, job_id=None):
@@ -897,7 +958,7 @@ def generate_video():
         project_name = request.form.get('project_name')
         camera_id = request.form.get('camera_id')
 
-        snapshots, snapshot_data, output_filename, start_dt, end_dt, error_msg = \
+        snapshot_count, snapshot_data, output_filename, start_dt, end_dt, error_msg = \
             _prepare_video_data(category_id, start_time, end_time, fps,
                                 show_timestamp, video_name, project_name, camera_id)
 
@@ -922,11 +983,11 @@ def generate_video():
 
         video_id = add_video_generation(
             video_filename=output_filename, video_path=video_path,
-            snapshot_count=len(snapshots), start_time=start_dt,
+            snapshot_count=snapshot_count, start_time=start_dt,
             end_time=end_dt, fps=fps, query_params=query_params,
         )
 
-        flash(f'Video generated successfully! {len(snapshots)} snapshots processed.', 'success')
+        flash(f'Video generated successfully! {snapshot_count} snapshots processed.', 'success')
         return redirect(url_for('download_video', video_id=video_id))
 
     except Exception as e:
@@ -971,7 +1032,7 @@ def api_start_video_generation():
         project_name = request.form.get('project_name')
         camera_id = request.form.get('camera_id')
 
-        snapshots, snapshot_data, output_filename, start_dt, end_dt, error_msg = \
+        snapshot_count, snapshot_data, output_filename, start_dt, end_dt, error_msg = \
             _prepare_video_data(category_id, start_time, end_time, fps,
                                 show_timestamp, video_name, project_name, camera_id)
 
@@ -985,7 +1046,7 @@ def api_start_video_generation():
             'video_path': None,
             'error': None,
             'completed': False,
-            'snapshot_count': len(snapshots),
+            'snapshot_count': snapshot_count,
             'output_filename': output_filename,
             'query_params': {
                 'category_id': category_id,
@@ -1007,7 +1068,7 @@ def api_start_video_generation():
         return jsonify({
             'success': True,
             'job_id': job_id,
-            'total_images': len(snapshots),
+            'total_images': snapshot_count,
         })
 
     except Exception as e:
@@ -1091,7 +1152,7 @@ def api_generate_video():
         project_name = request.form.get('project_name')
         camera_id = request.form.get('camera_id')
 
-        snapshots, snapshot_data, output_filename, start_dt, end_dt, error_msg = \
+        snapshot_count, snapshot_data, output_filename, start_dt, end_dt, error_msg = \
             _prepare_video_data(category_id, start_time, end_time, fps,
                                 show_timestamp, video_name, project_name, camera_id)
 
@@ -1112,7 +1173,7 @@ def api_generate_video():
 
         video_id = add_video_generation(
             video_filename=output_filename, video_path=video_path,
-            snapshot_count=len(snapshots), start_time=start_dt,
+            snapshot_count=snapshot_count, start_time=start_dt,
             end_time=end_dt, fps=fps, query_params=query_params,
         )
 
@@ -1120,7 +1181,7 @@ def api_generate_video():
             'success': True,
             'message': 'Video generated successfully!',
             'video_id': video_id,
-            'snapshot_count': len(snapshots),
+            'snapshot_count': snapshot_count,
         })
 
     except Exception as e:
@@ -1279,7 +1340,7 @@ def stats():
     """Statistics page"""
     db_stats = get_database_stats()
 
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -1784,29 +1845,21 @@ def online_access():
         local_ip = "127.0.0.1"
 
     td = _tunnel_snapshot()
-
-    unique_ips = {}
-    for v in td['visitors']:
-        ip = v['ip']
-        if ip not in unique_ips:
-            unique_ips[ip] = {'ip': ip, 'first_visit': v['time'], 'last_visit': v['time'],
-                              'visit_count': 1, 'pages': [v['path']]}
-        else:
-            unique_ips[ip]['last_visit'] = v['time']
-            unique_ips[ip]['visit_count'] += 1
-            if v['path'] not in unique_ips[ip]['pages']:
-                unique_ips[ip]['pages'].append(v['path'])
-
-    visitors_summary = list(unique_ips.values())
-    visitors_summary.sort(key=lambda x: x['last_visit'], reverse=True)
+    with _tunnel_lock:
+        visitors = tunnel_data['visitors']
+        recent_visitors = list(itertools.islice(reversed(visitors['log']), 100))
+        total_visits = visitors['total']
+        unique_visitors = len(visitors['by_ip'])
+        # Most recently seen first; copies, since the entries keep changing
+        visitors_summary = [dict(v) for v in itertools.islice(reversed(visitors['by_ip'].values()), 50)]
 
     return render_template('online_access.html',
                          tunnel_url=td['url'],
                          tunnel_set_at=td['set_at'],
-                         visitors=td['visitors'][-100:][::-1],
-                         visitors_summary=visitors_summary[:50],
-                         total_visits=len(td['visitors']),
-                         unique_visitors=len(unique_ips),
+                         visitors=recent_visitors,
+                         visitors_summary=visitors_summary,
+                         total_visits=total_visits,
+                         unique_visitors=unique_visitors,
                          local_url=f"https://localhost:{PORT}",
                          network_url=f"https://{local_ip}:{PORT}")
 
@@ -1833,22 +1886,22 @@ def set_tunnel_url():
 def get_tunnel_url():
     """Get the current tunnel URL"""
     td = _tunnel_snapshot()
-    return jsonify({'url': td['url'], 'set_at': td['set_at']})
+    return fjson({'url': td['url'], 'set_at': td['set_at']})
 
 
 @app.route('/api/visitors', methods=['GET'])
 def get_visitors():
-    """Get visitor data"""
-    td = _tunnel_snapshot()
-    unique_ips = {}
-    for v in td['visitors']:
-        ip = v['ip']
-        unique_ips[ip] = unique_ips.get(ip, 0) + 1
-
-    return jsonify({
-        'total_visits': len(td['visitors']),
-        'unique_visitors': len(unique_ips),
-        'recent_visitors': td['visitors'][-20:][::-1],
+    """Get visitor data (running counters, no scan of the log)"""
+    with _tunnel_lock:
+        visitors = tunnel_data['visitors']
+        total_visits = visitors['total']
+        unique_visitors = len(visitors['by_ip'])
+        recent_visitors = list(itertools.islice(reversed(visitors['log']), 20))
+
+    return fjson({
+        'total_visits': total_visits,
+        'unique_visitors': unique_visitors,
+        'recent_visitors': recent_visitors,
     })
 
 
@@ -1856,10 +1909,16 @@ def get_visitors():
 def clear_visitors():
     """Clear visitor data"""
     with _tunnel_lock:
-        tunnel_data['visitors'] = []
+        tunnel_data['visitors'] = _new_visitor_log()
     return jsonify({'success': True, 'message': 'Visitor data cleared'})
 
 
+# One keep-alive session for health probes so each check reuses the
+# TLS connection to the trycloudflare edge instead of re-handshaking.
+_health_session = requests.Session()
+_health_session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+
 def check_tunnel_health():
     """Check if tunnel is still working"""
     td = _tunnel_snapshot()
@@ -1872,8 +1931,7 @@ def check_tunnel_health():
 
     if td['url']:
         try:
-            import requests
-            response = requests.head(td['url'], timeout=5, allow_redirects=True)
+            response = _health_session.head(td['url'], timeout=5, allow_redirects=True)
             if response.status_code < 500:
                 _tunnel_set(last_check=datetime.now().isoformat())
                 return True, 'OK'
@@ -1884,6 +1942,26 @@ def check_tunnel_health():
     return True, 'Process running'
 
 
+def _iter_stream_lines(stream, chunk_size=4096):
+    """Yield decoded lines from a binary pipe, draining it in chunks.
+
+    One read1() per chunk instead of one readline() per line keeps the
+    tunnel reader thread cheap while cloudflared is logging heavily.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    while True:
+        chunk = stream.read1(chunk_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        yield from lines
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
 def is_cloudflared_running():
     """Check if cloudflared process is running"""
     try:
@@ -1918,7 +1996,7 @@ def tunnel_health():
 
     if td['status'] != 'running':
         if external_running and td['url']:
-            return jsonify({
+            return fjson({
                 'healthy': True,
                 'status': 'running',
                 'source': 'external',
@@ -1926,7 +2004,7 @@ def tunnel_health():
                 'message': 'Tunnel running from start.bat',
             })
 
-        return jsonify({
+        return fjson({
             'healthy': False,
             'status': td['status'],
             'error': td.get('error'),
@@ -1943,7 +2021,7 @@ def tunnel_health():
                 tunnel_data['status'] = 'needs_restart'
 
     td = _tunnel_snapshot()
-    return jsonify({
+    return fjson({
         'healthy': healthy,
         'status': td['status'],
         'message': message,
@@ -1980,11 +2058,7 @@ def start_tunnel():
             _tunnel_set(status='stopped', process=None)
 
     cloudflared_path = None
-    # Detect correct binary name for the current OS
-    if os.name == 'nt':
-        local_cf = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cloudflared.exe')
-    else:
-        local_cf = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cloudflared')
+    local_cf = _LOCAL_CF
     if os.path.exists(local_cf):
         # Verify the file is actually executable (not a broken download)
         file_size = os.path.getsize(local_cf)
@@ -2016,8 +2090,7 @@ def start_tunnel():
 
     # Detect whether Flask is running with SSL
     use_ssl = os.environ.get('USE_SSL', 'false').lower() in ('1', 'true', 'yes')
-    cert_exists = os.path.exists(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'certs', 'cert.pem'))
-    if use_ssl and cert_exists:
+    if use_ssl and _cert_exists():
         tunnel_target = f'https://localhost:{PORT}'
         tunnel_cmd = [cloudflared_path, 'tunnel', '--url', tunnel_target, '--no-tls-verify']
     else:
@@ -2036,8 +2109,7 @@ def start_tunnel():
                 popen_kwargs = dict(
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
+                    bufsize=65536,
                 )
                 if os.name == 'nt':
                     popen_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
@@ -2051,10 +2123,7 @@ def start_tunnel():
                 url_found = False
                 connection_count = 0
 
-                for line in iter(process.stdout.readline, ''):
-                    if not line:
-                        break
-
+                for line in _iter_stream_lines(process.stdout):
                     line_stripped = line.strip()
                     logger.debug(f"[TUNNEL] {line_stripped}")
 
@@ -2185,7 +2254,7 @@ def tunnel_status():
 
         td = dict(tunnel_data)
 
-    return jsonify({
+    return fjson({
         'status': actual_status,
         'url': td['url'],
         'set_at': td['set_at'],
@@ -2215,9 +2284,7 @@ def login():
     username = request.form.get('username', '').strip()
     password = request.form.get('password', '')
     next_url = request.form.get('next', '/')
-    visitor_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
-    if visitor_ip and ',' in visitor_ip:
-        visitor_ip = visitor_ip.split(',')[0].strip()
+    visitor_ip = _client_ip()
 
     # Check lockout
     is_locked, remaining = _check_lockout(visitor_ip)
@@ -2252,15 +2319,10 @@ def logout():
 
 
 @app.route('/security')
+@admin_required
 def security_settings_page():
     """Security settings page"""
-    user = get_current_user()
-    if not user:
-        flash('Please sign in', 'warning')
-        return redirect(url_for('login', next='/security'))
-    if user.get('role') != 'admin':
-        flash('Admin privileges required', 'error')
-        return redirect('/')
+    user = request.current_user
 
     settings = get_security_settings()
     users = get_all_users()
@@ -2277,13 +2339,9 @@ def security_settings_page():
 
 
 @app.route('/security/update-settings', methods=['POST'])
+@admin_required
 def security_update_settings():
     """Update security settings"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        flash('Admin privileges required', 'error')
-        return redirect('/')
-
     new_settings = {
         'require_login': 'require_login' in request.form,
         'session_timeout_minutes': int(request.form.get('session_timeout_minutes', 60)),
@@ -2299,22 +2357,16 @@ def security_update_settings():
 
 
 @app.route('/security/change-password', methods=['POST'])
+@login_required
 def security_change_password():
     """Change current user password"""
-    user = get_current_user()
-    if not user:
-        flash('Please sign in', 'warning')
-        return redirect(url_for('login'))
+    user = request.current_user
 
     current_pw = request.form.get('current_password', '')
     new_pw = request.form.get('new_password', '')
     confirm_pw = request.form.get('confirm_password', '')
 
-    # Verify current password
-    if not authenticate_user(user['username'], current_pw):
-        flash('Current password is incorrect', 'error')
-        return redirect(url_for('security_settings_page'))
-
+    # Cheap checks first so a typo never pays for a password hash verification
     if new_pw != confirm_pw:
         flash('New passwords do not match', 'error')
         return redirect(url_for('security_settings_page'))
@@ -2324,19 +2376,20 @@ def security_change_password():
         flash(msg, 'error')
         return redirect(url_for('security_settings_page'))
 
+    # Verify current password
+    if not authenticate_user(user['username'], current_pw):
+        flash('Current password is incorrect', 'error')
+        return redirect(url_for('security_settings_page'))
+
     change_password(user['username'], new_pw)
     flash('Password changed successfully', 'success')
     return redirect(url_for('security_settings_page'))
 
 
 @app.route('/security/add-user', methods=['POST'])
+@admin_required
 def security_add_user():
     """Add a new user"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        flash('Admin privileges required', 'error')
-        return redirect('/')
-
     username = request.form.get('username', '').strip()
     password = request.form.get('password', '')
     display_name = request.form.get('display_name', '').strip()
@@ -2357,12 +2410,10 @@ def security_add_user():
 
 
 @app.route('/security/delete-user', methods=['POST'])
+@admin_required
 def security_delete_user():
     """Delete a user"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        flash('Admin privileges required', 'error')
-        return redirect('/')
+    user = request.current_user
 
     target = request.form.get('username', '')
     if target == user['username']:
@@ -2377,13 +2428,9 @@ def security_delete_user():
 
 
 @app.route('/security/toggle-user', methods=['POST'])
+@admin_required
 def security_toggle_user():
     """Toggle user active/inactive"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        flash('Admin privileges required', 'error')
-        return redirect('/')
-
     target = request.form.get('username', '')
     if toggle_user_active(target):
         flash(f'User {target} status updated successfully', 'success')
@@ -2393,13 +2440,9 @@ def security_toggle_user():
 
 
 @app.route('/security/clear-sessions', methods=['POST'])
+@admin_required
 def security_clear_sessions():
     """Clear all sessions"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        flash('Admin privileges required', 'error')
-        return redirect('/')
-
     destroy_all_sessions()
     session.clear()
     flash('All sessions cleared', 'success')
@@ -2407,13 +2450,9 @@ def security_clear_sessions():
 
 
 @app.route('/security/revoke-session', methods=['POST'])
+@admin_required
 def security_revoke_session():
     """Revoke a specific session"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        flash('Admin privileges required', 'error')
-        return redirect('/')
-
     target_sid = request.form.get('session_id', '')
     if target_sid:
         destroy_session(target_sid)
@@ -2422,12 +2461,10 @@ def security_revoke_session():
 
 
 @app.route('/security/update-role', methods=['POST'])
+@admin_required
 def security_update_role():
     """Update a user's role"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        flash('Admin privileges required', 'error')
-        return redirect('/')
+    user = request.current_user
 
     target = request.form.get('username', '')
     new_role = request.form.get('role', '')
@@ -2444,12 +2481,9 @@ def security_update_role():
 
 
 @app.route('/security/update-permissions', methods=['POST'])
+@admin_required
 def security_update_permissions():
     """Update a user's permissions (AJAX endpoint)"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        return jsonify({'success': False, 'error': 'Admin required'}), 403
-
     data = request.get_json()
     if not data:
         return jsonify({'success': False, 'error': 'Invalid request'}), 400
@@ -2467,12 +2501,9 @@ def security_update_permissions():
 
 
 @app.route('/security/get-user-permissions/<username>')
+@admin_required
 def security_get_user_permissions(username):
     """Get a user's current permissions (AJAX)"""
-    user = get_current_user()
-    if not user or user.get('role') != 'admin':
-        return jsonify({'success': False, 'error': 'Admin required'}), 403
-
     perms = get_user_permissions(username)
     return jsonify({'success': True, 'permissions': perms})
 
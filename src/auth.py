@@ -6,20 +6,33 @@ and security settings (change password, manage sessions, 2FA toggle).
 """
 
 import os
+import copy
 import json
+import atexit
 import secrets
 import hashlib
+import ssl
+import string
 import time
 import threading
-from datetime import datetime, timedelta
-from functools import wraps
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache, wraps
+from itertools import islice
 
 from flask import (
-    session, request, redirect, url_for, flash, abort, jsonify
+    session, request, redirect, url_for, flash, abort, jsonify, g,
+    has_request_context,
 )
 
+try:
+    import orjson  # Optional: faster (de)serialization of the auth files
+except ImportError:
+    orjson = None
+
 from src.logger import get_logger
-from src.config import DATABASE_PATH
+from src.config import DATABASE_PATH, DEBUG
 
 logger = get_logger('auth')
 
@@ -29,7 +42,7 @@ logger = get_logger('auth')
 # =============================================================================
 
 # All permissions available in the system
-ALL_PERMISSIONS = [
+ALL_PERMISSIONS = (
     'dashboard',         # View dashboard
     'upload',            # Upload snapshots
     'search',            # Search/query snapshots
@@ -48,24 +61,25 @@ ALL_PERMISSIONS = [
     'auto_sync',         # View auto-sync info
     'about',             # View about page
     'security',          # Access security settings
-]
+)
+_ALL_PERMISSIONS_SET = frozenset(ALL_PERMISSIONS)
 
-# Default permissions per role
+# Default permissions per role (immutable; ordered for the UI / JSON)
 ROLE_DEFAULTS = {
-    'admin': ALL_PERMISSIONS.copy(),
-    'editor': [
+    'admin': ALL_PERMISSIONS,
+    'editor': (
         'dashboard', 'upload', 'search', 'view_snapshots',
         'edit_snapshots', 'delete_snapshots',
         'categories', 'manage_categories',
         'generate_video', 'videos', 'delete_videos',
         'import_drive', 'daily_snapshots', 'stats',
         'auto_sync', 'about',
-    ],
-    'viewer': [
+    ),
+    'viewer': (
         'dashboard', 'search', 'view_snapshots',
         'categories', 'videos', 'daily_snapshots',
         'stats', 'about',
-    ],
+    ),
 }
 
 # Human-readable labels for permissions
@@ -92,17 +106,28 @@ PERMISSION_LABELS = {
 
 # Group permissions for UI display
 PERMISSION_GROUPS = {
-    'Snapshots': ['dashboard', 'upload', 'search', 'view_snapshots', 'edit_snapshots', 'delete_snapshots', 'daily_snapshots'],
-    'Organization': ['categories', 'manage_categories', 'import_drive'],
-    'Videos': ['generate_video', 'videos', 'delete_videos'],
-    'System': ['stats', 'online_access', 'auto_sync', 'about', 'security'],
+    'Snapshots': ('dashboard', 'upload', 'search', 'view_snapshots', 'edit_snapshots', 'delete_snapshots', 'daily_snapshots'),
+    'Organization': ('categories', 'manage_categories', 'import_drive'),
+    'Videos': ('generate_video', 'videos', 'delete_videos'),
+    'System': ('stats', 'online_access', 'auto_sync', 'about', 'security'),
 }
 
 # ---------- Constants ----------
 AUTH_DB_FILE = os.path.join(os.path.dirname(DATABASE_PATH), 'auth.json')
+# Sessions and login history change far more often than users/settings,
+# so they live in their own files (history is append-only JSONL).
+AUTH_SESSIONS_FILE = os.path.join(os.path.dirname(DATABASE_PATH), 'auth_sessions.json')
+AUTH_HISTORY_FILE = os.path.join(os.path.dirname(DATABASE_PATH), 'auth_history.jsonl')
+LOGIN_HISTORY_MAX = 500
 SESSION_TIMEOUT_MINUTES = int(os.getenv('SESSION_TIMEOUT', '60'))
 MAX_LOGIN_ATTEMPTS = int(os.getenv('MAX_LOGIN_ATTEMPTS', '5'))
 LOCKOUT_DURATION_MINUTES = int(os.getenv('LOCKOUT_DURATION', '15'))
+MAX_ACTIVE_SESSIONS = int(os.getenv('MAX_ACTIVE_SESSIONS', '1000'))
+
+# Saves are coalesced and written by a background thread after this delay
+AUTH_FLUSH_DELAY_SECONDS = 0.5
+# In-memory session last_active values reach disk at most this often
+LAST_ACTIVE_PERSIST_SECONDS = 30
 
 _auth_lock = threading.Lock()
 
@@ -111,37 +136,145 @@ _auth_lock = threading.Lock()
 # PASSWORD HASHING (using hashlib — no extra dependency)
 # =============================================================================
 
+# New hashes use scrypt by default (memory-hard, parameters below).
+# PASSWORD_HASH_SCHEME can opt into PBKDF2 instead: 'pbkdf2_sha512' (faster
+# per iteration on 64-bit CPUs without SHA-NI) or 'pbkdf2_sha256' (faster
+# on CPUs with SHA extensions), at the OWASP iteration counts below.
+# Hashes are stored self-describing ("scheme$params$hash_hex"); bare hex
+# hashes are legacy PBKDF2-HMAC-SHA256 with 100k iterations. Anything not
+# in the current scheme is re-hashed on the next successful login.
+PASSWORD_HASH_SCHEME = os.getenv('PASSWORD_HASH_SCHEME', 'scrypt')
+SCRYPT_N = 2 ** 14                     # ~16 MB of memory per hash
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = {                  # OWASP minimums
+    'pbkdf2_sha256': 600_000,
+    'pbkdf2_sha512': 210_000,
+}
+_LEGACY_PBKDF2_ITERATIONS = 100_000
+
+if PASSWORD_HASH_SCHEME != 'scrypt' and PASSWORD_HASH_SCHEME not in PBKDF2_ITERATIONS:
+    logger.warning(f"Unknown PASSWORD_HASH_SCHEME '{PASSWORD_HASH_SCHEME}', using scrypt")
+    PASSWORD_HASH_SCHEME = 'scrypt'
+
+
+def _hash_prefix() -> str:
+    """Encoded-hash prefix (scheme + parameters) for new hashes."""
+    if PASSWORD_HASH_SCHEME == 'scrypt':
+        return f'scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$'
+    return f'{PASSWORD_HASH_SCHEME}${PBKDF2_ITERATIONS[PASSWORD_HASH_SCHEME]}$'
+
+
+def _derive(password: str, salt: str, scheme: str, params: list) -> bytes:
+    """Run the KDF named by *scheme* with its encoded *params*."""
+    if scheme == 'scrypt':
+        n, r, p = (int(v) for v in params)
+        return hashlib.scrypt(password.encode('utf-8'), salt=salt.encode('utf-8'),
+                              n=n, r=r, p=p, dklen=32)
+    digest = scheme.split('_', 1)[1]    # pbkdf2_sha512 -> sha512
+    return hashlib.pbkdf2_hmac(digest, password.encode('utf-8'), salt.encode('utf-8'),
+                               iterations=int(params[0]))
+
+
 def _hash_password(password: str, salt: str = None) -> tuple:
-    """Hash a password with PBKDF2-HMAC-SHA256. Returns (hash_hex, salt_hex)."""
+    """Hash a password with PASSWORD_HASH_SCHEME. Returns (encoded_hash, salt_hex)."""
     if salt is None:
         salt = secrets.token_hex(32)
-    pw_hash = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt.encode('utf-8'),
-        iterations=100_000,
-    )
-    return pw_hash.hex(), salt
+    prefix = _hash_prefix()
+    scheme, *params = prefix.rstrip('$').split('$')
+    return prefix + _derive(password, salt, scheme, params).hex(), salt
+
+
+@lru_cache(maxsize=64)
+def _parse_stored_hash(stored_hash: str) -> tuple | None:
+    """Split a stored hash into (scheme, params, digest bytes), or None if
+    it is malformed. Cached so the hex is decoded once per stored value."""
+    if '$' in stored_hash:
+        scheme, *params, expected = stored_hash.split('$')
+        if scheme != 'scrypt' and scheme not in PBKDF2_ITERATIONS:
+            return None
+    else:
+        scheme, params, expected = 'pbkdf2_sha256', [_LEGACY_PBKDF2_ITERATIONS], stored_hash
+    try:
+        return scheme, tuple(params), bytes.fromhex(expected)
+    except ValueError:
+        return None
 
 
 def _verify_password(password: str, stored_hash: str, salt: str) -> bool:
-    """Verify a password against stored hash."""
-    pw_hash = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode('utf-8'),
-        salt.encode('utf-8'),
-        iterations=100_000,
-    )
-    return secrets.compare_digest(pw_hash.hex(), stored_hash)
+    """Verify a password against stored hash (any supported scheme)."""
+    parsed = _parse_stored_hash(stored_hash)
+    if parsed is None:
+        return False
+    scheme, params, expected = parsed
+    return secrets.compare_digest(_derive(password, salt, scheme, params), expected)
+
+
+def _check_hash_backend():
+    """Log the libcrypto behind hashlib; warn if it predates SHA-NI support.
+
+    hashlib's scrypt/pbkdf2_hmac run on OpenSSL's EVP digests, which pick
+    SHA-NI / ARMv8 SHA instructions at runtime from OpenSSL 1.1.1 on.
+    """
+    logger.debug(f"Password hashing backend: {ssl.OPENSSL_VERSION}")
+    if ssl.OPENSSL_VERSION_INFO < (1, 1, 1) or not hasattr(hashlib, 'scrypt'):
+        logger.warning(f"{ssl.OPENSSL_VERSION} is older than 1.1.1 — password "
+                       f"hashing will be slow and scrypt may be unavailable")
+
+
+_check_hash_backend()
+
+
+def _needs_rehash(stored_hash: str) -> bool:
+    """True if the stored hash does not use the current scheme and parameters."""
+    return not stored_hash.startswith(_hash_prefix())
 
 
 # =============================================================================
 # AUTH DATA PERSISTENCE (JSON file)
 # =============================================================================
 
-def _get_permissions_for_role(role: str) -> list:
-    """Get default permissions for a role."""
-    return ROLE_DEFAULTS.get(role, ROLE_DEFAULTS['viewer']).copy()
+@lru_cache(maxsize=8)
+def _get_permissions_for_role(role: str) -> frozenset:
+    """Get default permissions for a role (cached; unknown roles get viewer's)."""
+    return frozenset(ROLE_DEFAULTS.get(role, ROLE_DEFAULTS['viewer']))
+
+
+def _user_permission_set(data: dict, username: str) -> frozenset:
+    """Permissions of a stored user as a shared frozenset.
+
+    Sets are memoised per published auth data object, so repeated session
+    checks don't rebuild them; a new publish starts a fresh memo.
+    """
+    memo = _auth_cache.get('perm_sets')
+    if memo is None or memo[0] is not data:
+        memo = (data, {})
+        _auth_cache['perm_sets'] = memo
+    perms = memo[1].get(username)
+    if perms is None:
+        user = data['users'][username]
+        role = user.get('role', 'viewer')
+        if role == 'admin':
+            perms = _ALL_PERMISSIONS_SET
+        else:
+            perms = user.get('permissions')
+            perms = _get_permissions_for_role(role) if perms is None else frozenset(perms)
+        memo[1][username] = perms
+    return perms
+
+
+def _default_security_settings() -> dict:
+    """Return default security settings."""
+    return {
+        'require_login': True,           # Require login for all pages
+        'session_timeout_minutes': SESSION_TIMEOUT_MINUTES,
+        'max_login_attempts': MAX_LOGIN_ATTEMPTS,
+        'lockout_duration_minutes': LOCKOUT_DURATION_MINUTES,
+        'password_min_length': 8,
+        'enforce_strong_password': True,
+        'log_login_activity': True,
+        'allowed_ips': [],               # Empty = allow all
+    }
 
 
 def _default_auth_data() -> dict:
@@ -158,241 +291,597 @@ def _default_auth_data() -> dict:
                 'last_login': None,
                 'is_active': True,
                 'require_2fa': False,
-                'permissions': ALL_PERMISSIONS.copy(),
+                'permissions': list(ALL_PERMISSIONS),
             }
         },
-        'security_settings': {
-            'require_login': True,           # Require login for all pages
-            'session_timeout_minutes': SESSION_TIMEOUT_MINUTES,
-            'max_login_attempts': MAX_LOGIN_ATTEMPTS,
-            'lockout_duration_minutes': LOCKOUT_DURATION_MINUTES,
-            'password_min_length': 8,
-            'enforce_strong_password': True,
-            'log_login_activity': True,
-            'allowed_ips': [],               # Empty = allow all
-        },
+        'security_settings': _default_security_settings(),
         'login_attempts': {},                # {ip: {count, last_attempt}}
         'active_sessions': {},               # {session_id: {user, ip, created, last_active}}
-        'login_history': [],                 # [{user, ip, time, success}]
+        'login_history': deque(maxlen=LOGIN_HISTORY_MAX),  # [{user, ip, time, success}]
     }
 
 
-def _load_auth_data() -> dict:
-    """Load auth data from JSON file."""
-    with _auth_lock:
-        if not os.path.exists(AUTH_DB_FILE):
-            data = _default_auth_data()
-            _save_auth_data_unsafe(data)
-            return data
+# Keys stored in AUTH_DB_FILE; the rest come from the sessions/history files
+_MAIN_KEYS = ('users', 'security_settings', 'login_attempts')
+
+# Parsed auth files, reused until one of their mtimes changes on disk.
+# While _auth_dirty is set the cache holds changes not yet flushed.
+# 'written' is the data last known to be on disk (for change detection);
+# 'perm_sets' memoises per-user permission frozensets for 'data'.
+_auth_cache = {'data': None, 'mtime': None, 'written': None, 'perm_sets': None}
+_auth_dirty = False
+_auth_flush_event = threading.Event()
+_auth_flusher = None
+_history_pending = []           # history entries not yet appended to disk
+_history_lines_on_disk = 0
+# Latest last_active per session as epoch seconds, kept in memory so that
+# touching a session costs no lock, write or ISO parsing; merged into
+# active_sessions (as ISO strings) whenever we flush.
+_last_active_mem = {}
+_last_active_flushed = 0.0
+# Failed-login counters ({ip: {count, last_attempt}}) live in memory, seeded
+# from disk on first use and written out with the next flush. Losing a few on
+# a crash only shortens a lockout, which is not worth a write per attempt.
+_login_attempts = None
+_attempts_lock = threading.Lock()
+# Number of active admins in the cached data; None until first needed
+_active_admin_count = None
+
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _auth_files_mtime() -> tuple:
+    """st_mtime_ns of the auth files (None for a missing file)."""
+    mtimes = []
+    for path in (AUTH_DB_FILE, AUTH_SESSIONS_FILE, AUTH_HISTORY_FILE):
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _read_login_history() -> list:
+    """Read the last LOGIN_HISTORY_MAX entries from the history JSONL file."""
+    global _history_lines_on_disk
+    history = []
+    with open(AUTH_HISTORY_FILE, 'rb') as f:
+        lines = f.readlines()
+    _history_lines_on_disk = len(lines)
+    for line in lines[-LOGIN_HISTORY_MAX:]:
         try:
-            with open(AUTH_DB_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            # Ensure all keys exist (migration-safe)
+            history.append(_json_loads(line))
+        except ValueError:
+            continue
+    return history
+
+
+def _read_auth_data_unsafe() -> dict:
+    """Return cached auth data, re-parsing only if a file changed.
+
+    Must be called within _auth_lock. The returned dict is shared — do not
+    mutate it.
+    """
+    global _active_admin_count
+    if _auth_dirty:
+        return _auth_cache['data']
+    mtime = _auth_files_mtime()
+    if _auth_cache['data'] is not None and _auth_cache['mtime'] == mtime:
+        return _auth_cache['data']
+    # The data is about to be replaced; recount admins on next use
+    _active_admin_count = None
+    if mtime[0] is None:
+        data = _default_auth_data()
+        _save_auth_data_unsafe(data)
+        return data
+    try:
+        with open(AUTH_DB_FILE, 'rb') as f:
+            data = _json_loads(f.read())
+        # Older versions kept sessions/history inside auth.json
+        legacy_layout = 'active_sessions' in data or 'login_history' in data
+        if mtime[1] is not None:
+            with open(AUTH_SESSIONS_FILE, 'rb') as f:
+                data['active_sessions'] = _json_loads(f.read())
+        if mtime[2] is not None:
+            data['login_history'] = _read_login_history()
+        # Ensure all keys exist (migration-safe)
+        if any(key not in data for key in _MAIN_KEYS + ('active_sessions', 'login_history')):
             defaults = _default_auth_data()
             for key in defaults:
                 if key not in data:
                     data[key] = defaults[key]
-            for key in defaults['security_settings']:
-                if key not in data.get('security_settings', {}):
-                    data['security_settings'][key] = defaults['security_settings'][key]
-            return data
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Failed to load auth data: {e}")
-            return _default_auth_data()
+        for key, value in _default_security_settings().items():
+            if key not in data['security_settings']:
+                data['security_settings'][key] = value
+        # Bounded in memory: appends evict the oldest entry, no re-slicing
+        data['login_history'] = deque(data['login_history'], maxlen=LOGIN_HISTORY_MAX)
+    except (ValueError, IOError) as e:
+        logger.error(f"Failed to load auth data: {e}")
+        return _default_auth_data()
+    if legacy_layout:
+        _auth_cache['written'] = None
+        _save_auth_data_unsafe(data)
+        logger.info("Auth data migrated to separate sessions/history files")
+        return data
+    _auth_cache['data'] = data
+    _auth_cache['mtime'] = mtime
+    _auth_cache['written'] = data
+    return data
 
 
-def _save_auth_data(data: dict):
-    """Save auth data to JSON file (thread-safe)."""
+def _load_auth_data_ro() -> dict:
+    """Load auth data for reading only (shared cached object)."""
     with _auth_lock:
-        _save_auth_data_unsafe(data)
+        return _read_auth_data_unsafe()
+
+
+def _start_flusher_unsafe():
+    """Start the background writer on first use — call within _auth_lock."""
+    global _auth_flusher
+    if _auth_flusher is None:
+        _auth_flusher = threading.Thread(target=_auth_flush_loop, name='auth-flusher', daemon=True)
+        _auth_flusher.start()
+
 
+# How a transaction copies a top-level key on first access. Sessions are
+# only ever added, removed or replaced whole, so a shallow copy is enough;
+# other keys are mutated in place. Login history does not go through
+# transactions at all — see _append_login_history.
+_TRANSACTION_COPY = {
+    'active_sessions': dict,
+}
+
+
+class _TransactionData(dict):
+    """Copy-on-write view of the cached auth data for one transaction.
+
+    A top-level key is copied from the shared cache the first time it is
+    read, so a transaction only pays for copying the parts it touches.
+    """
 
-def _save_auth_data_unsafe(data: dict):
-    """Save auth data — must be called within _auth_lock."""
+    def __init__(self, base: dict):
+        super().__init__()
+        self._base = base
+
+    def __missing__(self, key):
+        value = _TRANSACTION_COPY.get(key, copy.deepcopy)(self._base[key])
+        self[key] = value
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._base
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def changes(self) -> dict:
+        """Top-level keys whose value differs from the cached data."""
+        return {key: value for key, value in self.items()
+                if key not in self._base or self._base[key] != value}
+
+
+@contextmanager
+def _auth_transaction(immediate: bool = False):
+    """Read, modify and publish auth data in a single critical section.
+
+    Yields a copy-on-write view of the data. On normal exit the changed
+    keys replace the cache and a debounced write is scheduled — or, with
+    *immediate*, are written before returning (used for security-relevant
+    changes such as sessions, passwords and roles). Without changes
+    nothing is published, and if the block raises nothing is published.
+    If nothing is published after a change was made — the block raised or
+    the immediate write failed — the cached admin count is dropped, since
+    the block may already have adjusted it.
+
+        with _auth_transaction(immediate=True) as data:
+            data['users'][name]['is_active'] = False
+    """
+    global _auth_dirty, _active_admin_count
+    with _auth_lock:
+        base = _read_auth_data_unsafe()
+        view = _TransactionData(base)
+        try:
+            yield view
+            changes = view.changes()
+            if not changes:
+                return
+            data = {**base, **changes}
+            if immediate:
+                if not _save_auth_data_unsafe(data):
+                    _active_admin_count = None
+                return
+        except BaseException:
+            _active_admin_count = None
+            raise
+        _auth_cache['data'] = data
+        _auth_dirty = True
+        _start_flusher_unsafe()
+    _auth_flush_event.set()
+
+
+def _append_login_history(entry: dict):
+    """Append a login history entry without a transaction.
+
+    History is append-only, so the entry goes straight onto the cached
+    deque (maxlen drops the oldest) instead of into a copy of it, and is
+    queued for the flusher to append to the history file. Readers of the
+    deque must hold _auth_lock.
+    """
+    global _auth_dirty
+    with _auth_lock:
+        _read_auth_data_unsafe()['login_history'].append(entry)
+        _history_pending.append(entry)
+        _auth_dirty = True
+        _start_flusher_unsafe()
+    _auth_flush_event.set()
+
+
+def _write_json_atomic(path: str, obj):
+    """Write JSON to *path* via a temp file + os.replace."""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(_json_dumps(obj))
+    os.replace(tmp_file, path)
+
+
+def _write_login_history_unsafe(history: deque):
+    """Append pending history entries, or rewrite the file when compacting."""
+    global _history_lines_on_disk
+    rewrite = (_auth_cache['written'] is None
+               or _history_lines_on_disk + len(_history_pending) > 2 * LOGIN_HISTORY_MAX)
+    if rewrite:
+        lines = [_json_dumps(entry) + b'\n' for entry in history]
+        tmp_file = AUTH_HISTORY_FILE + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(b''.join(lines))
+        os.replace(tmp_file, AUTH_HISTORY_FILE)
+        _history_lines_on_disk = len(lines)
+    elif _history_pending:
+        with open(AUTH_HISTORY_FILE, 'ab') as f:
+            f.write(b''.join(_json_dumps(entry) + b'\n' for entry in _history_pending))
+        _history_lines_on_disk += len(_history_pending)
+    _history_pending.clear()
+
+
+def _iso_to_ts(value: str | None) -> float:
+    """Epoch seconds for a stored ISO timestamp (0.0 if missing or invalid)."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _session_last_active(session_id: str, sess: dict) -> float:
+    """Most recent last_active of a session in epoch seconds."""
+    ts = _last_active_mem.get(session_id)
+    if ts is None:
+        ts = _iso_to_ts(sess.get('last_active'))
+    return ts
+
+
+def _merge_last_active_unsafe(data: dict) -> dict:
+    """Return *data* with in-memory last_active bumps applied (new dict if changed)."""
+    sessions = data['active_sessions']
+    merged = None
+    for sid, ts in _last_active_mem.copy().items():
+        sess = sessions.get(sid)
+        if sess is None:
+            _last_active_mem.pop(sid, None)
+            continue
+        last_active = datetime.fromtimestamp(ts).isoformat()
+        if last_active > sess.get('last_active', ''):
+            if merged is None:
+                merged = dict(sessions)
+            merged[sid] = {**sess, 'last_active': last_active}
+    if merged is None:
+        return data
+    return {**data, 'active_sessions': merged}
+
+
+def _merge_login_attempts_unsafe(data: dict) -> dict:
+    """Return *data* with the in-memory login attempt counters applied."""
+    if _login_attempts is None:
+        return data
+    with _attempts_lock:
+        attempts = copy.deepcopy(_login_attempts)
+    if attempts == data['login_attempts']:
+        return data
+    return {**data, 'login_attempts': attempts}
+
+
+def _save_auth_data_unsafe(data: dict) -> bool:
+    """Write changed auth files to disk now — must be called within _auth_lock.
+
+    Returns False (and leaves the cache as it was) if the write failed.
+    """
+    global _auth_dirty
+    written = _auth_cache['written'] or {}
+    data = _merge_login_attempts_unsafe(_merge_last_active_unsafe(data))
     try:
-        os.makedirs(os.path.dirname(AUTH_DB_FILE) or '.', exist_ok=True)
-        with open(AUTH_DB_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if written is not data:
+            if any(written.get(key) != data[key] for key in _MAIN_KEYS):
+                _write_json_atomic(AUTH_DB_FILE, {key: data[key] for key in _MAIN_KEYS})
+            if written.get('active_sessions') != data['active_sessions']:
+                _write_json_atomic(AUTH_SESSIONS_FILE, data['active_sessions'])
+        # History is appended in place, so the data can be unchanged with
+        # entries still pending
+        if written is not data or _history_pending:
+            _write_login_history_unsafe(data['login_history'])
+        # What we just wrote becomes the cache — no need to re-parse it
+        _auth_cache['data'] = data
+        _auth_cache['written'] = data
+        _auth_cache['mtime'] = _auth_files_mtime()
+        _auth_dirty = False
+        return True
     except IOError as e:
         logger.error(f"Failed to save auth data: {e}")
+        return False
+
+
+def flush_auth_data():
+    """Write any pending auth changes to disk immediately."""
+    with _auth_lock:
+        if _auth_dirty or _last_active_mem or _login_attempts:
+            _save_auth_data_unsafe(_read_auth_data_unsafe())
+
+
+def _auth_flush_loop():
+    """Background writer: waits for saves, lets a burst settle, writes once."""
+    while True:
+        _auth_flush_event.wait()
+        time.sleep(AUTH_FLUSH_DELAY_SECONDS)
+        _auth_flush_event.clear()
+        flush_auth_data()
+
+
+atexit.register(flush_auth_data)
 
 
 # =============================================================================
 # SESSION MANAGEMENT
 # =============================================================================
 
+def _prune_sessions(sessions: dict, timeout_minutes: int):
+    """Drop expired sessions, then evict the least recently active ones
+    beyond MAX_ACTIVE_SESSIONS.
+
+    Must be called within _auth_lock.
+    """
+    cutoff = time.time() - timeout_minutes * 60
+    for sid in [sid for sid, sess in sessions.items() if _session_last_active(sid, sess) < cutoff]:
+        del sessions[sid]
+        _last_active_mem.pop(sid, None)
+    excess = len(sessions) - MAX_ACTIVE_SESSIONS
+    if excess > 0:
+        by_age = sorted(sessions, key=lambda sid: _session_last_active(sid, sessions[sid]))
+        for sid in by_age[:excess]:
+            del sessions[sid]
+            _last_active_mem.pop(sid, None)
+
+
 def create_session(username: str, ip: str) -> str:
     """Create a new session for the user. Returns session_id."""
     session_id = secrets.token_hex(32)
-    data = _load_auth_data()
-    data['active_sessions'][session_id] = {
-        'user': username,
-        'ip': ip,
-        'created': datetime.now().isoformat(),
-        'last_active': datetime.now().isoformat(),
-        'user_agent': request.headers.get('User-Agent', '')[:200],
-    }
-    # Update last login
-    if username in data['users']:
-        data['users'][username]['last_login'] = datetime.now().isoformat()
-    _save_auth_data(data)
+    user_agent = request.headers.get('User-Agent', '')[:200]
+    with _auth_transaction(immediate=True) as data:
+        data['active_sessions'][session_id] = {
+            'user': username,
+            'ip': ip,
+            'created': datetime.now().isoformat(),
+            'last_active': datetime.now().isoformat(),
+            'user_agent': user_agent,
+        }
+        # Lazy sweep so abandoned sessions don't accumulate forever
+        _prune_sessions(data['active_sessions'],
+                        data['security_settings'].get('session_timeout_minutes', SESSION_TIMEOUT_MINUTES))
+        # Update last login
+        if username in data['users']:
+            data['users'][username]['last_login'] = datetime.now().isoformat()
+    _forget_request_user()
     return session_id
 
 
 def validate_session(session_id: str) -> dict | None:
     """Validate session and return user info, or None if invalid."""
+    global _last_active_flushed
     if not session_id:
         return None
-    data = _load_auth_data()
+    data = _load_auth_data_ro()
     sess = data.get('active_sessions', {}).get(session_id)
     if not sess:
         return None
 
     # Check timeout
     timeout = data['security_settings'].get('session_timeout_minutes', SESSION_TIMEOUT_MINUTES)
-    last_active = datetime.fromisoformat(sess['last_active'])
-    if datetime.now() - last_active > timedelta(minutes=timeout):
+    now = time.time()
+    if now - _session_last_active(session_id, sess) > timeout * 60:
         # Session expired
-        del data['active_sessions'][session_id]
-        _save_auth_data(data)
+        with _auth_transaction() as rw:
+            rw['active_sessions'].pop(session_id, None)
+            _last_active_mem.pop(session_id, None)
         return None
 
-    # Update last active
-    sess['last_active'] = datetime.now().isoformat()
-    _save_auth_data(data)
+    # Update last active in memory only; the flusher persists it periodically
+    _last_active_mem[session_id] = now
+    if now - _last_active_flushed >= LAST_ACTIVE_PERSIST_SECONDS:
+        _last_active_flushed = now
+        with _auth_lock:
+            _start_flusher_unsafe()
+        _auth_flush_event.set()
 
     user = data['users'].get(sess['user'])
     if not user or not user.get('is_active', True):
         return None
 
     # Get permissions — admin always gets all
-    role = user.get('role', 'viewer')
-    if role == 'admin':
-        perms = ALL_PERMISSIONS.copy()
-    else:
-        perms = user.get('permissions', _get_permissions_for_role(role))
-
     return {
         'username': sess['user'],
-        'role': role,
+        'role': user.get('role', 'viewer'),
         'display_name': user.get('display_name', sess['user']),
-        'permissions': perms,
+        'permissions': _user_permission_set(data, sess['user']),
     }
 
 
 def destroy_session(session_id: str):
     """Remove a session."""
-    data = _load_auth_data()
-    data['active_sessions'].pop(session_id, None)
-    _save_auth_data(data)
+    with _auth_transaction(immediate=True) as data:
+        data['active_sessions'].pop(session_id, None)
+        _last_active_mem.pop(session_id, None)
+    _forget_request_user()
 
 
 def destroy_all_sessions(username: str = None):
     """Remove all sessions, optionally for a specific user."""
-    data = _load_auth_data()
-    if username:
-        data['active_sessions'] = {
-            k: v for k, v in data['active_sessions'].items()
-            if v.get('user') != username
-        }
-    else:
-        data['active_sessions'] = {}
-    _save_auth_data(data)
+    with _auth_transaction(immediate=True) as data:
+        if username:
+            data['active_sessions'] = {
+                k: v for k, v in data['active_sessions'].items()
+                if v.get('user') != username
+            }
+        else:
+            data['active_sessions'] = {}
 
 
 # =============================================================================
 # LOGIN ATTEMPT TRACKING
 # =============================================================================
 
+def _get_login_attempts() -> dict:
+    """In-memory login attempt counters; use under _attempts_lock."""
+    global _login_attempts
+    if _login_attempts is None:
+        seed = copy.deepcopy(_load_auth_data_ro().get('login_attempts', {}))
+        with _attempts_lock:
+            if _login_attempts is None:
+                _login_attempts = seed
+    return _login_attempts
+
+
 def _check_lockout(ip: str) -> tuple:
     """Check if an IP is locked out. Returns (is_locked, remaining_seconds)."""
-    data = _load_auth_data()
-    settings = data['security_settings']
-    attempts = data.get('login_attempts', {}).get(ip)
+    login_attempts = _get_login_attempts()
+    with _attempts_lock:
+        attempts = login_attempts.get(ip)
+        if attempts:
+            attempts = dict(attempts)
     if not attempts:
         return False, 0
+    settings = _load_auth_data_ro()['security_settings']
 
     max_attempts = settings.get('max_login_attempts', MAX_LOGIN_ATTEMPTS)
     lockout_minutes = settings.get('lockout_duration_minutes', LOCKOUT_DURATION_MINUTES)
 
     if attempts['count'] >= max_attempts:
-        last = datetime.fromisoformat(attempts['last_attempt'])
-        lockout_end = last + timedelta(minutes=lockout_minutes)
-        if datetime.now() < lockout_end:
-            remaining = (lockout_end - datetime.now()).total_seconds()
+        last = attempts.get('last_attempt_ts') or _iso_to_ts(attempts['last_attempt'])
+        remaining = last + lockout_minutes * 60 - time.time()
+        if remaining > 0:
             return True, int(remaining)
         else:
-            # Lockout expired, reset
-            data['login_attempts'].pop(ip, None)
-            _save_auth_data(data)
+            # Lockout expired, reset (in memory only)
+            with _attempts_lock:
+                login_attempts.pop(ip, None)
             return False, 0
     return False, 0
 
 
 def _record_login_attempt(ip: str, username: str, success: bool):
     """Record a login attempt."""
-    data = _load_auth_data()
-
     # Record in history
-    if data['security_settings'].get('log_login_activity', True):
-        data.setdefault('login_history', [])
-        data['login_history'].append({
+    if _load_auth_data_ro()['security_settings'].get('log_login_activity', True):
+        entry = {
             'user': username,
             'ip': ip,
             'time': datetime.now().isoformat(),
             'success': success,
             'user_agent': request.headers.get('User-Agent', '')[:200],
-        })
-        # Keep last 500 entries
-        data['login_history'] = data['login_history'][-500:]
-
-    if success:
-        data.get('login_attempts', {}).pop(ip, None)
-    else:
-        attempts = data.setdefault('login_attempts', {}).get(ip, {'count': 0, 'last_attempt': None})
-        attempts['count'] = attempts.get('count', 0) + 1
-        attempts['last_attempt'] = datetime.now().isoformat()
-        data['login_attempts'][ip] = attempts
+        }
+        _append_login_history(entry)
 
-    _save_auth_data(data)
+    login_attempts = _get_login_attempts()
+    with _attempts_lock:
+        if success:
+            login_attempts.pop(ip, None)
+        else:
+            attempts = login_attempts.get(ip, {'count': 0, 'last_attempt': None})
+            attempts['count'] = attempts.get('count', 0) + 1
+            attempts['last_attempt_ts'] = time.time()
+            attempts['last_attempt'] = datetime.fromtimestamp(attempts['last_attempt_ts']).isoformat()
+            login_attempts[ip] = attempts
 
 
 # =============================================================================
 # USER MANAGEMENT
 # =============================================================================
 
+def _is_active_admin(user: dict) -> bool:
+    """True for an admin whose account is enabled."""
+    return user.get('role') == 'admin' and bool(user.get('is_active'))
+
+
+def _count_active_admins_unsafe(data: dict) -> int:
+    """Active admin count, maintained incrementally — call within _auth_lock.
+
+    With DEBUG on, the cached value is checked against a full recount.
+    """
+    global _active_admin_count
+    if _active_admin_count is None or DEBUG:
+        actual = sum(1 for u in data['users'].values() if _is_active_admin(u))
+        if _active_admin_count not in (None, actual):
+            logger.error(f"Cached admin count {_active_admin_count} != actual {actual}")
+        _active_admin_count = actual
+    return _active_admin_count
+
+
+def _track_admin_change_unsafe(was_admin: bool, is_admin: bool):
+    """Adjust the cached admin count after a user changed — within _auth_lock."""
+    global _active_admin_count
+    if _active_admin_count is not None:
+        _active_admin_count += int(is_admin) - int(was_admin)
+
+
 def authenticate_user(username: str, password: str) -> dict | None:
     """Authenticate a user. Returns user dict or None."""
-    data = _load_auth_data()
+    data = _load_auth_data_ro()
     user = data['users'].get(username)
     if not user:
         return None
     if not user.get('is_active', True):
         return None
     if _verify_password(password, user['password_hash'], user['salt']):
-        role = user.get('role', 'viewer')
-        if role == 'admin':
-            perms = ALL_PERMISSIONS.copy()
-        else:
-            perms = user.get('permissions', _get_permissions_for_role(role))
+        if _needs_rehash(user['password_hash']):
+            # Transparently upgrade old hashes on successful login
+            pw_hash, salt = _hash_password(password)
+            with _auth_transaction() as data:
+                user = data['users'][username]
+                user['password_hash'], user['salt'] = pw_hash, salt
+            logger.info(f"Password hash upgraded to {PASSWORD_HASH_SCHEME} for user: {username}")
         return {
             'username': username,
-            'role': role,
+            'role': user.get('role', 'viewer'),
             'display_name': user.get('display_name', username),
-            'permissions': perms,
+            'permissions': _user_permission_set(data, username),
         }
     return None
 
 
 def change_password(username: str, new_password: str) -> bool:
     """Change user password."""
-    data = _load_auth_data()
-    if username not in data['users']:
+    if username not in _load_auth_data_ro()['users']:
         return False
     pw_hash, salt = _hash_password(new_password)
-    data['users'][username]['password_hash'] = pw_hash
-    data['users'][username]['salt'] = salt
-    _save_auth_data(data)
+    with _auth_transaction(immediate=True) as data:
+        if username not in data['users']:
+            return False
+        data['users'][username]['password_hash'] = pw_hash
+        data['users'][username]['salt'] = salt
     logger.info(f"Password changed for user: {username}")
     return True
 
@@ -400,79 +889,82 @@ def change_password(username: str, new_password: str) -> bool:
 def create_user(username: str, password: str, role: str = 'viewer',
                 display_name: str = '', permissions: list = None) -> bool:
     """Create a new user with role and permissions."""
-    data = _load_auth_data()
-    if username in data['users']:
+    if username in _load_auth_data_ro()['users']:
         return False
     if role not in ROLE_DEFAULTS:
         role = 'viewer'
     pw_hash, salt = _hash_password(password)
-    user_perms = permissions if permissions is not None else _get_permissions_for_role(role)
-    data['users'][username] = {
-        'password_hash': pw_hash,
-        'salt': salt,
-        'role': role,
-        'display_name': display_name or username,
-        'created_at': datetime.now().isoformat(),
-        'last_login': None,
-        'is_active': True,
-        'require_2fa': False,
-        'permissions': user_perms,
-    }
-    _save_auth_data(data)
+    user_perms = list(permissions if permissions is not None else ROLE_DEFAULTS[role])
+    with _auth_transaction(immediate=True) as data:
+        if username in data['users']:
+            return False
+        data['users'][username] = {
+            'password_hash': pw_hash,
+            'salt': salt,
+            'role': role,
+            'display_name': display_name or username,
+            'created_at': datetime.now().isoformat(),
+            'last_login': None,
+            'is_active': True,
+            'require_2fa': False,
+            'permissions': user_perms,
+        }
+        _track_admin_change_unsafe(False, role == 'admin')
     logger.info(f"User created: {username} (role: {role})")
     return True
 
 
 def delete_user(username: str) -> bool:
     """Delete a user (cannot delete last admin)."""
-    data = _load_auth_data()
-    if username not in data['users']:
-        return False
-    # Don't delete the last admin
-    admin_count = sum(1 for u in data['users'].values() if u.get('role') == 'admin' and u.get('is_active'))
-    if data['users'][username].get('role') == 'admin' and admin_count <= 1:
-        return False
-    del data['users'][username]
-    # Also destroy their sessions
-    data['active_sessions'] = {
-        k: v for k, v in data['active_sessions'].items()
-        if v.get('user') != username
-    }
-    _save_auth_data(data)
+    with _auth_transaction(immediate=True) as data:
+        if username not in data['users']:
+            return False
+        # Don't delete the last admin
+        was_admin = _is_active_admin(data['users'][username])
+        if data['users'][username].get('role') == 'admin' and _count_active_admins_unsafe(data) <= 1:
+            return False
+        del data['users'][username]
+        _track_admin_change_unsafe(was_admin, False)
+        # Also destroy their sessions
+        data['active_sessions'] = {
+            k: v for k, v in data['active_sessions'].items()
+            if v.get('user') != username
+        }
     logger.info(f"User deleted: {username}")
     return True
 
 
 def toggle_user_active(username: str) -> bool:
     """Toggle user active status."""
-    data = _load_auth_data()
-    if username not in data['users']:
-        return False
-    user = data['users'][username]
-    # Don't deactivate the last admin
-    if user.get('role') == 'admin' and user.get('is_active', True):
-        admin_count = sum(1 for u in data['users'].values()
-                         if u.get('role') == 'admin' and u.get('is_active'))
-        if admin_count <= 1:
+    with _auth_transaction(immediate=True) as data:
+        if username not in data['users']:
             return False
-    user['is_active'] = not user.get('is_active', True)
-    if not user['is_active']:
-        # Destroy sessions for deactivated user
-        data['active_sessions'] = {
-            k: v for k, v in data['active_sessions'].items()
-            if v.get('user') != username
-        }
-    _save_auth_data(data)
+        user = data['users'][username]
+        # Don't deactivate the last admin
+        if user.get('role') == 'admin' and user.get('is_active', True):
+            if _count_active_admins_unsafe(data) <= 1:
+                return False
+        was_admin = _is_active_admin(user)
+        user['is_active'] = not user.get('is_active', True)
+        _track_admin_change_unsafe(was_admin, _is_active_admin(user))
+        if not user['is_active']:
+            # Destroy sessions for deactivated user
+            data['active_sessions'] = {
+                k: v for k, v in data['active_sessions'].items()
+                if v.get('user') != username
+            }
     return True
 
 
 def get_all_users() -> list:
     """Get all users (without sensitive data)."""
-    data = _load_auth_data()
+    data = _load_auth_data_ro()
     users = []
     for uname, udata in data['users'].items():
         role = udata.get('role', 'viewer')
-        perms = udata.get('permissions', _get_permissions_for_role(role))
+        perms = udata.get('permissions')
+        if perms is None:
+            perms = list(_get_permissions_for_role(role))
         users.append({
             'username': uname,
             'role': role,
@@ -487,85 +979,86 @@ def get_all_users() -> list:
 
 def update_user_permissions(username: str, permissions: list) -> bool:
     """Update permissions for a user."""
-    data = _load_auth_data()
-    if username not in data['users']:
-        return False
-    # Admin always keeps all permissions
-    if data['users'][username].get('role') == 'admin':
-        data['users'][username]['permissions'] = ALL_PERMISSIONS.copy()
-    else:
-        # Only allow valid permissions
-        valid = [p for p in permissions if p in ALL_PERMISSIONS]
-        data['users'][username]['permissions'] = valid
-    _save_auth_data(data)
+    with _auth_transaction(immediate=True) as data:
+        if username not in data['users']:
+            return False
+        # Admin always keeps all permissions
+        if data['users'][username].get('role') == 'admin':
+            data['users'][username]['permissions'] = list(ALL_PERMISSIONS)
+        else:
+            # Only allow valid permissions, deduplicated in canonical order
+            requested = frozenset(permissions)
+            valid = [p for p in ALL_PERMISSIONS if p in requested]
+            data['users'][username]['permissions'] = valid
     logger.info(f"Permissions updated for user: {username}")
     return True
 
 
 def update_user_role(username: str, new_role: str) -> bool:
     """Update the role of a user and reset to role defaults."""
-    data = _load_auth_data()
-    if username not in data['users']:
-        return False
-    if new_role not in ROLE_DEFAULTS:
-        return False
-    # Don't demote the last admin
-    user = data['users'][username]
-    if user.get('role') == 'admin' and new_role != 'admin':
-        admin_count = sum(1 for u in data['users'].values()
-                         if u.get('role') == 'admin' and u.get('is_active'))
-        if admin_count <= 1:
+    with _auth_transaction(immediate=True) as data:
+        if username not in data['users']:
             return False
-    data['users'][username]['role'] = new_role
-    data['users'][username]['permissions'] = _get_permissions_for_role(new_role)
-    _save_auth_data(data)
+        if new_role not in ROLE_DEFAULTS:
+            return False
+        # Don't demote the last admin
+        user = data['users'][username]
+        if user.get('role') == 'admin' and new_role != 'admin':
+            if _count_active_admins_unsafe(data) <= 1:
+                return False
+        was_admin = _is_active_admin(user)
+        user['role'] = new_role
+        user['permissions'] = list(ROLE_DEFAULTS[new_role])
+        _track_admin_change_unsafe(was_admin, _is_active_admin(user))
     logger.info(f"Role changed for {username}: {new_role}")
     return True
 
 
 def get_user_permissions(username: str) -> list:
     """Get permissions for a specific user."""
-    data = _load_auth_data()
+    data = _load_auth_data_ro()
     user = data['users'].get(username)
     if not user:
         return []
     if user.get('role') == 'admin':
-        return ALL_PERMISSIONS.copy()
-    return user.get('permissions', _get_permissions_for_role(user.get('role', 'viewer')))
+        return ALL_PERMISSIONS
+    perms = user.get('permissions')
+    if perms is None:
+        perms = list(_get_permissions_for_role(user.get('role', 'viewer')))
+    return perms
 
 
 def get_security_settings() -> dict:
     """Get current security settings."""
-    data = _load_auth_data()
+    data = _load_auth_data_ro()
     return data.get('security_settings', {})
 
 
 def update_security_settings(new_settings: dict) -> bool:
     """Update security settings."""
-    data = _load_auth_data()
     allowed_keys = {
         'require_login', 'session_timeout_minutes', 'max_login_attempts',
         'lockout_duration_minutes', 'password_min_length',
         'enforce_strong_password', 'log_login_activity', 'allowed_ips',
     }
-    for key, value in new_settings.items():
-        if key in allowed_keys:
-            data['security_settings'][key] = value
-    _save_auth_data(data)
+    with _auth_transaction(immediate=True) as data:
+        for key, value in new_settings.items():
+            if key in allowed_keys:
+                data['security_settings'][key] = value
     logger.info(f"Security settings updated: {list(new_settings.keys())}")
     return True
 
 
 def get_login_history(limit: int = 50) -> list:
     """Get recent login history."""
-    data = _load_auth_data()
-    history = data.get('login_history', [])
-    return list(reversed(history[-limit:]))
+    # The deque is appended to in place, so copy it under the lock
+    with _auth_lock:
+        return list(islice(reversed(_read_auth_data_unsafe()['login_history']), limit))
 
 
 def get_active_sessions() -> list:
     """Get all active sessions."""
-    data = _load_auth_data()
+    data = _load_auth_data_ro()
     sessions = []
     for sid, sdata in data.get('active_sessions', {}).items():
         sessions.append({
@@ -574,15 +1067,29 @@ def get_active_sessions() -> list:
             'user': sdata.get('user'),
             'ip': sdata.get('ip'),
             'created': sdata.get('created'),
-            'last_active': sdata.get('last_active'),
+            'last_active': datetime.fromtimestamp(_session_last_active(sid, sdata)).isoformat(),
             'user_agent': sdata.get('user_agent', ''),
         })
     return sessions
 
 
+_ASCII_UPPER = frozenset(string.ascii_uppercase)
+_ASCII_LOWER = frozenset(string.ascii_lowercase)
+_ASCII_DIGITS = frozenset(string.digits)
+_SPECIAL_CHARS = frozenset('!@#$%^&*()_+-=[]{}|;:,.<>?')
+
+
+def _has_char_class(chars: set, ascii_class: frozenset, predicate) -> bool:
+    """True if *chars* has a member of *ascii_class*, or a non-ASCII char
+    satisfying *predicate* (so e.g. 'É' still counts as uppercase)."""
+    if not ascii_class.isdisjoint(chars):
+        return True
+    return any(predicate(c) for c in chars if not c.isascii())
+
+
 def validate_password_strength(password: str) -> tuple:
     """Validate password strength. Returns (is_valid, message)."""
-    data = _load_auth_data()
+    data = _load_auth_data_ro()
     settings = data.get('security_settings', {})
     min_len = settings.get('password_min_length', 8)
 
@@ -590,10 +1097,11 @@ def validate_password_strength(password: str) -> tuple:
         return False, f'Password must be at least {min_len} characters'
 
     if settings.get('enforce_strong_password', True):
-        has_upper = any(c.isupper() for c in password)
-        has_lower = any(c.islower() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_special = any(c in '!@#$%^&*()_+-=[]{}|;:,.<>?' for c in password)
+        chars = set(password)
+        has_upper = _has_char_class(chars, _ASCII_UPPER, str.isupper)
+        has_lower = _has_char_class(chars, _ASCII_LOWER, str.islower)
+        has_digit = _has_char_class(chars, _ASCII_DIGITS, str.isdigit)
+        has_special = not _SPECIAL_CHARS.isdisjoint(chars)
 
         if not (has_upper and has_lower and has_digit):
             return False, 'Password must contain uppercase, lowercase, and numbers'
@@ -605,12 +1113,28 @@ def validate_password_strength(password: str) -> tuple:
 # FLASK DECORATORS
 # =============================================================================
 
+def _request_user() -> dict | None:
+    """validate_session() for the current request, evaluated once per request.
+
+    enforce_login, the decorators and the template context processors all
+    ask for the user; only the first call does any work.
+    """
+    if 'auth_user' not in g:
+        g.auth_user = validate_session(session.get('session_id'))
+    return g.auth_user
+
+
+def _forget_request_user():
+    """Drop the per-request user after the current session changed."""
+    if has_request_context():
+        g.pop('auth_user', None)
+
+
 def login_required(f):
     """Decorator: always require login."""
     @wraps(f)
     def decorated(*args, **kwargs):
-        session_id = session.get('session_id')
-        user = validate_session(session_id)
+        user = _request_user()
         if not user:
             session.clear()
             flash('Please sign in', 'warning')
@@ -620,16 +1144,26 @@ def login_required(f):
     return decorated
 
 
+def _wants_json() -> bool:
+    """True for AJAX/API callers that expect a JSON error, not a redirect."""
+    return (request.is_json or request.path.startswith('/api/')
+            or request.accept_mimetypes.best == 'application/json')
+
+
 def admin_required(f):
-    """Decorator: require admin role."""
+    """Decorator: require admin role.
+
+    JSON callers get a 403 body instead of a flash + redirect.
+    """
     @wraps(f)
     def decorated(*args, **kwargs):
-        session_id = session.get('session_id')
-        user = validate_session(session_id)
-        if not user:
-            flash('Please sign in', 'warning')
-            return redirect(url_for('login', next=request.path))
-        if user.get('role') != 'admin':
+        user = _request_user()
+        if not user or user.get('role') != 'admin':
+            if _wants_json():
+                return jsonify({'success': False, 'error': 'Admin required'}), 403
+            if not user:
+                flash('Please sign in', 'warning')
+                return redirect(url_for('login', next=request.path))
             flash('Admin privileges required', 'error')
             return redirect(url_for('index'))
         request.current_user = user
@@ -649,8 +1183,7 @@ def permission_required(permission: str):
     def decorator(f):
         @wraps(f)
         def decorated(*args, **kwargs):
-            session_id = session.get('session_id')
-            user = validate_session(session_id)
+            user = _request_user()
             if not user:
                 session.clear()
                 if request.path.startswith('/api/'):
@@ -662,8 +1195,7 @@ def permission_required(permission: str):
                 request.current_user = user
                 return f(*args, **kwargs)
             # Check specific permission
-            user_perms = user.get('permissions', [])
-            if permission not in user_perms:
+            if permission not in user.get('permissions', ()):
                 if request.path.startswith('/api/'):
                     return jsonify({'success': False, 'error': 'Permission denied'}), 403
                 flash('You do not have permission to access this page', 'error')
@@ -680,12 +1212,9 @@ def has_permission(user: dict, permission: str) -> bool:
         return False
     if user.get('role') == 'admin':
         return True
-    return permission in user.get('permissions', [])
+    return permission in user.get('permissions', ())
 
 
 def get_current_user() -> dict | None:
     """Get the currently logged-in user, or None."""
-    session_id = session.get('session_id')
-    if not session_id:
-        return None
-    return validate_session(session_id)
+    return _request_user()
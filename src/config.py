@@ -57,4 +57,6 @@ except RuntimeError as e:
 
 # Create necessary directories (backward compatibility)
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Holds the SQLite database and the auth JSON files
+os.makedirs(os.path.dirname(DATABASE_PATH) or '.', exist_ok=True)
 
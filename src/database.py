@@ -1,7 +1,12 @@
 import sqlite3
 import os
+import json
+import queue
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
 from src.config import DATABASE_PATH
 from src.logger import get_logger
@@ -17,6 +22,12 @@ def _normalize_db_path(stored_path: str, base_folder: str) -> str:
         return stored_path
     if os.path.exists(stored_path):
         return stored_path
+    return _remap_path(stored_path, base_folder)
+
+
+@lru_cache(maxsize=4096)
+def _remap_path(stored_path: str, base_folder: str) -> str:
+    """Map a stored filepath into base_folder (pure string work, no stat)."""
     folder_name = os.path.basename(base_folder)
     for sep in ('\\', '/'):
         marker = folder_name + sep
@@ -29,7 +40,43 @@ def _normalize_db_path(stored_path: str, base_folder: str) -> str:
     return os.path.join(base_folder, basename)
 
 # --- Connection Pool (Fix #5) ---
-_local = threading.local()
+# WAL lets any number of readers run alongside one writer, so reads borrow
+# from a small pool of query_only connections while every write goes
+# through a single shared connection.
+READ_POOL_SIZE = 8
+_read_pool = queue.LifoQueue(maxsize=READ_POOL_SIZE)
+_write_conn = None
+_write_lock = threading.RLock()
+
+# Per-connection tuning: WAL makes NORMAL sync safe (fsync at checkpoints
+# only); temp tables/sorts stay in RAM; ~64 MB page cache; reads through
+# mmap; wait up to 5 s for a competing writer instead of SQLITE_BUSY;
+# SQLite checkpoints by itself every 1000 WAL pages.
+_CONNECTION_PRAGMAS = '''
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+    PRAGMA wal_autocheckpoint=1000;
+'''
+_wal_enabled = False
+
+# Auto-checkpoints never shrink the -wal file and are skipped while readers
+# are active, so a background thread also truncates it periodically.
+WAL_CHECKPOINT_SECONDS = 300
+_checkpointer = None
+
+# Full-text index over tags/notes/original_filename. The trigram tokenizer
+# (SQLite 3.34+) keeps the old substring semantics, including Thai text that
+# has no word breaks. Set by init_database once the table is in place.
+_FTS_COLUMNS = ('tags', 'notes', 'original_filename')
+_fts_enabled = False
+
+# Hour/minute of capture_time. The daily-time query must use exactly these
+# expressions for SQLite to match them against idx_daily_time.
+_CAPTURE_HOUR_SQL = "CAST(strftime('%H', capture_time) AS INTEGER)"
+_CAPTURE_MINUTE_SQL = "CAST(strftime('%M', capture_time) AS INTEGER)"
 
 VALID_ORDER_COLUMNS = {
     'capture_time ASC', 'capture_time DESC',
@@ -41,37 +88,138 @@ VALID_ORDER_COLUMNS = {
 }
 
 
-@contextmanager
-def get_db():
-    """Context manager for database connections with connection reuse per thread."""
-    conn = getattr(_local, 'connection', None)
-    reused = conn is not None
-    if not reused:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
+def _connect(read_only=False):
+    """Open a tuned connection to DATABASE_PATH."""
+    global _wal_enabled
+    # sqlite3 keeps an LRU of prepared statements per connection, keyed by
+    # the SQL text; our queries come from a small set of fixed strings.
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    # journal_mode=WAL is persistent in the file — switch it once per process
+    if not _wal_enabled:
         conn.execute("PRAGMA journal_mode=WAL")
-        _local.connection = conn
+        _wal_enabled = True
+    conn.executescript(_CONNECTION_PRAGMAS)
+    if read_only:
+        conn.execute("PRAGMA query_only=TRUE")
+    return conn
+
+
+@contextmanager
+def get_read_db():
+    """Borrow a read-only connection from the pool (opened on demand).
+
+    Pooled connections stay open, so their prepared statement caches
+    survive from one call to the next.
+    """
+    try:
+        conn = _read_pool.get_nowait()
+    except queue.Empty:
+        conn = _connect(read_only=True)
     try:
         yield conn
-    except Exception:
-        conn.rollback()
-        raise
     finally:
-        if not reused:
-            _local.connection = None
+        try:
+            _read_pool.put_nowait(conn)
+        except queue.Full:
             conn.close()
 
 
+@contextmanager
+def get_write_db():
+    """Hold the single writer connection for the duration of the block."""
+    global _write_conn
+    with _write_lock:
+        if _write_conn is None:
+            _write_conn = _connect()
+            _start_checkpointer_unsafe()
+        try:
+            yield _write_conn
+        except Exception:
+            _write_conn.rollback()
+            raise
+
+
+# Read/write access for existing callers
+get_db = get_write_db
+
+
+def checkpoint_wal():
+    """Copy the WAL into the database and truncate the -wal file.
+
+    Returns SQLite's (busy, wal_pages, checkpointed_pages) row.
+    """
+    with get_write_db() as conn:
+        return tuple(conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone())
+
+
+def _checkpoint_loop():
+    while True:
+        time.sleep(WAL_CHECKPOINT_SECONDS)
+        try:
+            checkpoint_wal()
+        except sqlite3.Error as e:
+            logger.warning(f"WAL checkpoint failed: {e}")
+
+
+def _start_checkpointer_unsafe():
+    """Start the periodic checkpoint thread — call within _write_lock."""
+    global _checkpointer
+    if _checkpointer is None:
+        _checkpointer = threading.Thread(target=_checkpoint_loop, name='wal-checkpoint', daemon=True)
+        _checkpointer.start()
+
+
 def get_db_connection():
     """Create a database connection (legacy compatibility)"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return _connect()
+
+
+def _init_search_index(cursor):
+    """Create the snapshots_fts index and its sync triggers. Returns True if usable."""
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        return False
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'snapshots_fts'")
+    new_index = cursor.fetchone() is None
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS snapshots_fts USING fts5(
+                tags, notes, original_filename,
+                content='snapshots', content_rowid='id',
+                tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Full-text search unavailable, using LIKE: {e}")
+        return False
+
+    columns = ', '.join(_FTS_COLUMNS)
+    new_values = ', '.join(f'new.{c}' for c in _FTS_COLUMNS)
+    old_values = ', '.join(f'old.{c}' for c in _FTS_COLUMNS)
+    cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS snapshots_fts_ai AFTER INSERT ON snapshots BEGIN
+            INSERT INTO snapshots_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS snapshots_fts_ad AFTER DELETE ON snapshots BEGIN
+            INSERT INTO snapshots_fts(snapshots_fts, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS snapshots_fts_au AFTER UPDATE OF {columns} ON snapshots BEGIN
+            INSERT INTO snapshots_fts(snapshots_fts, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO snapshots_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END;
+    ''')
+    if new_index:
+        # Index the rows that existed before the table was created
+        cursor.execute("INSERT INTO snapshots_fts(snapshots_fts) VALUES ('rebuild')")
+    return True
 
 
 def init_database():
     """Initialize the database with required tables"""
-    with get_db() as conn:
+    global _fts_enabled
+    with get_write_db() as conn:
         cursor = conn.cursor()
 
         # Create categories table for hierarchical classification
@@ -158,16 +306,32 @@ def init_database():
             ON snapshots (category_id, capture_time)
         ''')
 
+        # Project/camera listings ordered by time walk this index in order
+        # (no sort step); it also covers plain (project, camera) lookups, so
+        # the older two-column idx_project_camera is dropped. ORDER BY ...
+        # DESC on idx_category_capture is served by a reverse scan.
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_proj_cam_time'")
+        new_time_index = cursor.fetchone() is None
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_project_camera 
-            ON snapshots (project_name, camera_id)
+            CREATE INDEX IF NOT EXISTS idx_proj_cam_time
+            ON snapshots (project_name, camera_id, capture_time DESC)
         ''')
+        cursor.execute('DROP INDEX IF EXISTS idx_project_camera')
 
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_file_hash
             ON snapshots (file_hash)
         ''')
 
+        # Index on the hour/minute expressions so daily-time lookups seek
+        # instead of parsing capture_time on every row
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_daily_time'")
+        new_daily_index = cursor.fetchone() is None
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_daily_time
+            ON snapshots ({_CAPTURE_HOUR_SQL}, {_CAPTURE_MINUTE_SQL})
+        ''')
+
         # Create video_generations table to track generated videos
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS video_generations (
@@ -183,8 +347,14 @@ def init_database():
             )
         ''')
 
+        _fts_enabled = _init_search_index(cursor)
+
         conn.commit()
 
+        if new_time_index or new_daily_index:
+            # Refresh planner statistics so the new index is picked up
+            cursor.execute('ANALYZE')
+
         # Insert default categories if none exist
         cursor.execute('SELECT COUNT(*) FROM categories')
         if cursor.fetchone()[0] == 0:
@@ -204,39 +374,78 @@ def init_database():
                 default_categories
             )
             conn.commit()
+            _invalidate_categories()
 
     logger.info(f"Database initialized at {DATABASE_PATH}")
 
 
+# --- Category cache ---
+# The categories table is tiny and rarely changes, but is consulted on
+# almost every page and upload. Writes in this process invalidate the cache
+# immediately; the TTL picks up changes made by other processes (e.g. the
+# folder watcher) within a minute.
+CATEGORY_CACHE_TTL = 60
+_category_cache = None
+_category_cache_lock = threading.Lock()
+
+
+def _load_categories():
+    """Read all categories once and index them (rows are immutable sqlite3.Row)."""
+    with get_read_db() as conn:
+        rows = conn.execute('SELECT * FROM categories ORDER BY parent_id, name').fetchall()
+    by_name = {}
+    for row in sorted(rows, key=lambda r: r['id']):
+        by_name.setdefault(row['name'], row)     # same row as "WHERE name = ?"
+    return {
+        'rows': rows,
+        'by_id': {row['id']: row for row in rows},
+        'by_name': by_name,
+        'parents': {row['parent_id'] for row in rows if row['parent_id'] is not None},
+        'loaded': time.monotonic(),
+    }
+
+
+def _categories():
+    """Return the category cache, reloading it when missing or expired."""
+    global _category_cache
+    cache = _category_cache
+    if cache is None or time.monotonic() - cache['loaded'] > CATEGORY_CACHE_TTL:
+        with _category_cache_lock:
+            cache = _category_cache
+            if cache is None or time.monotonic() - cache['loaded'] > CATEGORY_CACHE_TTL:
+                cache = _category_cache = _load_categories()
+    return cache
+
+
+def _invalidate_categories():
+    """Drop the category cache after a write to the categories table."""
+    global _category_cache
+    _category_cache = None
+
+
 def get_categories_tree():
     """Get categories in hierarchical structure"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM categories ORDER BY parent_id, name')
-        categories = cursor.fetchall()
-    return categories
+    return list(_categories()['rows'])
 
 
 def add_category(name, parent_id=None, description=''):
     """Add a new category"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            'INSERT INTO categories (name, parent_id, description) VALUES (?, ?, ?)',
-            (name, parent_id, description)
-        )
-        conn.commit()
+        with conn:
+            cursor.execute(
+                'INSERT INTO categories (name, parent_id, description) VALUES (?, ?, ?)',
+                (name, parent_id, description)
+            )
         category_id = cursor.lastrowid
+    _invalidate_categories()
     return category_id
 
 
 def get_category_by_name(name):
     """Get a category by name. Returns dict or None."""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM categories WHERE name = ?', (name,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+    row = _categories()['by_name'].get(name)
+    return dict(row) if row else None
 
 
 def check_duplicate_hash(file_hash):
@@ -244,7 +453,7 @@ def check_duplicate_hash(file_hash):
     Returns the existing snapshot dict if duplicate, None otherwise."""
     if not file_hash:
         return None
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM snapshots WHERE file_hash = ? LIMIT 1', (file_hash,))
         row = cursor.fetchone()
@@ -255,52 +464,38 @@ def is_leaf_category(category_id):
     """Check if a category is a leaf (has no children). Returns True if leaf, False if parent."""
     if category_id is None:
         return True
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM categories WHERE parent_id = ?', (category_id,))
-        child_count = cursor.fetchone()[0]
-        return child_count == 0
+    return category_id not in _categories()['parents']
 
 
 def category_exists(category_id):
     """Check if a category_id exists in the database."""
     if category_id is None:
         return True
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM categories WHERE id = ?', (category_id,))
-        return cursor.fetchone()[0] > 0
+    return category_id in _categories()['by_id']
 
 
 def get_leaf_categories():
     """Get only leaf categories (those with no children)."""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT c.* FROM categories c
-            WHERE NOT EXISTS (
-                SELECT 1 FROM categories child WHERE child.parent_id = c.id
-            )
-            ORDER BY c.parent_id, c.name
-        ''')
-        return cursor.fetchall()
+    cache = _categories()
+    return [row for row in cache['rows'] if row['id'] not in cache['parents']]
 
 
 def add_snapshot(filename, original_filename, filepath, category_id,
                  capture_time, file_size, width, height, source='upload',
                  tags='', notes='', project_name=None, camera_id=None, file_hash=None):
     """Add a new snapshot to the database"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO snapshots 
-            (filename, original_filename, filepath, category_id, capture_time, 
-             file_size, width, height, source, tags, notes, project_name, camera_id, file_hash)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (filename, original_filename, filepath, category_id, capture_time,
-              file_size, width, height, source, tags, notes, project_name, camera_id, file_hash))
-        conn.commit()
+        with conn:
+            cursor.execute('''
+                INSERT INTO snapshots 
+                (filename, original_filename, filepath, category_id, capture_time, 
+                 file_size, width, height, source, tags, notes, project_name, camera_id, file_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (filename, original_filename, filepath, category_id, capture_time,
+                  file_size, width, height, source, tags, notes, project_name, camera_id, file_hash))
         snapshot_id = cursor.lastrowid
+    _invalidate_filter_values()
     return snapshot_id
 
 
@@ -315,78 +510,113 @@ def add_snapshots_batch(snapshot_list):
     """
     if not snapshot_list:
         return 0
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.executemany('''
+    rows = [
+        (s['filename'], s['original_filename'], s['filepath'], s.get('category_id'),
+         s['capture_time'], s.get('file_size', 0), s.get('width', 0), s.get('height', 0),
+         s.get('source', 'upload'), s.get('tags', ''), s.get('notes', ''),
+         s.get('project_name'), s.get('camera_id'), s.get('file_hash'))
+        for s in snapshot_list
+    ]
+    # One transaction around the whole executemany: one commit for the batch
+    with get_write_db() as conn, conn:
+        conn.executemany('''
             INSERT INTO snapshots 
             (filename, original_filename, filepath, category_id, capture_time, 
              file_size, width, height, source, tags, notes, project_name, camera_id, file_hash)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', [
-            (s['filename'], s['original_filename'], s['filepath'], s.get('category_id'),
-             s['capture_time'], s.get('file_size', 0), s.get('width', 0), s.get('height', 0),
-             s.get('source', 'upload'), s.get('tags', ''), s.get('notes', ''),
-             s.get('project_name'), s.get('camera_id'), s.get('file_hash'))
-            for s in snapshot_list
-        ])
-        conn.commit()
+        ''', rows)
+    _invalidate_filter_values()
     return len(snapshot_list)
 
 
+# Filter name -> SQL condition, in the order conditions are emitted
+_FILTER_CONDITIONS = {
+    'category_id': 'category_id = ?',
+    'start_time': 'capture_time >= ?',
+    'end_time': 'capture_time <= ?',
+    'source': 'source = ?',
+    'tags': 'tags LIKE ?',
+    'project_name': 'project_name = ?',
+    'camera_id': 'camera_id = ?',
+}
+
+
 def _build_filter_clause(category_id=None, start_time=None, end_time=None,
                           source=None, tags=None, project_name=None, camera_id=None):
-    """Build shared WHERE clause for query/count (eliminates duplication)."""
-    clauses = []
-    params = []
-
-    if category_id is not None:
-        clauses.append('category_id = ?')
-        params.append(category_id)
-    if start_time:
-        clauses.append('capture_time >= ?')
-        params.append(start_time)
-    if end_time:
-        clauses.append('capture_time <= ?')
-        params.append(end_time)
-    if source:
-        clauses.append('source = ?')
-        params.append(source)
-    if tags:
-        clauses.append('tags LIKE ?')
-        params.append(f'%{tags}%')
-    if project_name:
-        clauses.append('project_name = ?')
-        params.append(project_name)
-    if camera_id:
-        clauses.append('camera_id = ?')
-        params.append(camera_id)
-
-    where = ' AND '.join(clauses) if clauses else '1=1'
-    return where, params
+    """Build shared WHERE filters for query/count.
 
+    Returns (keys, params): *keys* is the tuple of active filter names,
+    which selects one cached SQL string per filter shape.
+    """
+    filters = (
+        ('category_id', category_id, category_id is not None),
+        ('start_time', start_time, bool(start_time)),
+        ('end_time', end_time, bool(end_time)),
+        ('source', source, bool(source)),
+        ('tags', f'%{tags}%', bool(tags)),
+        ('project_name', project_name, bool(project_name)),
+        ('camera_id', camera_id, bool(camera_id)),
+    )
+    keys = tuple(key for key, _, active in filters if active)
+    params = [value for _, value, active in filters if active]
+    return keys, params
 
-def query_snapshots(category_id=None, start_time=None, end_time=None,
-                    source=None, tags=None, limit=None, offset=0,
-                    order_by='capture_time DESC', project_name=None, camera_id=None):
-    """Query snapshots with various filters"""
+
+@lru_cache(maxsize=128)
+def _where_sql(keys):
+    """WHERE condition for a filter shape (see _build_filter_clause)."""
+    return ' AND '.join(_FILTER_CONDITIONS[key] for key in keys) or '1=1'
+
+
+@lru_cache(maxsize=128)
+def _count_sql(keys):
+    """COUNT statement for a filter shape."""
+    return f'SELECT COUNT(*) FROM snapshots WHERE {_where_sql(keys)}'
+
+
+@lru_cache(maxsize=256)
+def _query_templates(keys, order_by):
+    """Every statement for a filter shape and a validated ORDER BY, built once.
+
+    Returns (select_all, select_page, count).
+    """
+    select_all = f'SELECT * FROM snapshots WHERE {_where_sql(keys)} ORDER BY {order_by}'
+    return select_all, select_all + ' LIMIT ? OFFSET ?', _count_sql(keys)
+
+
+def iter_snapshots(category_id=None, start_time=None, end_time=None,
+                   source=None, tags=None, limit=None, offset=0,
+                   order_by='capture_time DESC', project_name=None, camera_id=None):
+    """Yield snapshots matching the filters one row at a time.
+
+    Same arguments as query_snapshots, but rows stream from the cursor
+    instead of being collected into a list. The read connection stays
+    borrowed until the generator is exhausted or closed.
+    """
     # Fix #2: SQL Injection — whitelist ORDER BY
     if order_by not in VALID_ORDER_COLUMNS:
         order_by = 'capture_time DESC'
 
-    where, params = _build_filter_clause(
+    keys, params = _build_filter_clause(
         category_id, start_time, end_time, source, tags, project_name, camera_id)
+    select_all, select_page, _ = _query_templates(keys, order_by)
 
-    query = f'SELECT * FROM snapshots WHERE {where} ORDER BY {order_by}'
-
+    query = select_all
     if limit:
-        query += ' LIMIT ? OFFSET ?'
+        query = select_page
         params.extend([limit, offset])
 
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        snapshots = cursor.fetchall()
-    return snapshots
+    with get_read_db() as conn:
+        yield from conn.execute(query, params)
+
+
+def query_snapshots(category_id=None, start_time=None, end_time=None,
+                    source=None, tags=None, limit=None, offset=0,
+                    order_by='capture_time DESC', project_name=None, camera_id=None):
+    """Query snapshots with various filters"""
+    return list(iter_snapshots(
+        category_id, start_time, end_time, source, tags, limit, offset,
+        order_by, project_name, camera_id))
 
 
 def query_snapshots_with_count(category_id=None, start_time=None, end_time=None,
@@ -394,29 +624,34 @@ def query_snapshots_with_count(category_id=None, start_time=None, end_time=None,
                                order_by='capture_time DESC', project_name=None, camera_id=None):
     """Query snapshots AND count in one connection (Fix #9)
 
+    A page is a COUNT plus an index-ordered LIMIT/OFFSET; a window count
+    (COUNT(*) OVER ()) would sort every matching row before the LIMIT.
+
     Returns:
         tuple: (snapshots_list, total_count)
     """
     if order_by not in VALID_ORDER_COLUMNS:
         order_by = 'capture_time DESC'
 
-    where, params = _build_filter_clause(
+    keys, params = _build_filter_clause(
         category_id, start_time, end_time, source, tags, project_name, camera_id)
+    select_all, select_page, count_sql = _query_templates(keys, order_by)
 
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
 
+        if not limit:
+            # Unpaged: the result itself is the count
+            cursor.execute(select_all, params)
+            snapshots = cursor.fetchall()
+            return snapshots, len(snapshots)
+
         # Count
-        cursor.execute(f'SELECT COUNT(*) FROM snapshots WHERE {where}', params)
+        cursor.execute(count_sql, params)
         total_count = cursor.fetchone()[0]
 
         # Query
-        query = f'SELECT * FROM snapshots WHERE {where} ORDER BY {order_by}'
-        query_params = list(params)
-        if limit:
-            query += ' LIMIT ? OFFSET ?'
-            query_params.extend([limit, offset])
-        cursor.execute(query, query_params)
+        cursor.execute(select_page, params + [limit, offset])
         snapshots = cursor.fetchall()
 
     return snapshots, total_count
@@ -425,28 +660,29 @@ def query_snapshots_with_count(category_id=None, start_time=None, end_time=None,
 def count_snapshots(category_id=None, start_time=None, end_time=None,
                     source=None, tags=None, project_name=None, camera_id=None):
     """Count total snapshots matching filters (for pagination)"""
-    where, params = _build_filter_clause(
+    keys, params = _build_filter_clause(
         category_id, start_time, end_time, source, tags, project_name, camera_id)
 
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute(f'SELECT COUNT(*) FROM snapshots WHERE {where}', params)
+        cursor.execute(_count_sql(keys), params)
         count = cursor.fetchone()[0]
     return count
 
 
 def get_snapshots_by_daily_time(hour, minute, tolerance_minutes=5, project_name=None, camera_id=None):
     """Get snapshots captured at approximately the same time each day"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
 
-        query = '''
+        # Minute window as a range so both columns of idx_daily_time are used
+        query = f'''
             SELECT * FROM snapshots
             WHERE 
-                CAST(strftime('%H', capture_time) AS INTEGER) = ?
-                AND ABS(CAST(strftime('%M', capture_time) AS INTEGER) - ?) <= ?
+                {_CAPTURE_HOUR_SQL} = ?
+                AND {_CAPTURE_MINUTE_SQL} BETWEEN ? AND ?
         '''
-        params = [hour, minute, tolerance_minutes]
+        params = [hour, minute - tolerance_minutes, minute + tolerance_minutes]
 
         if project_name:
             query += ' AND project_name = ?'
@@ -465,7 +701,7 @@ def get_snapshots_by_daily_time(hour, minute, tolerance_minutes=5, project_name=
 
 def get_snapshot_by_id(snapshot_id):
     """Get a specific snapshot by ID"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM snapshots WHERE id = ?', (snapshot_id,))
         snapshot = cursor.fetchone()
@@ -475,21 +711,21 @@ def get_snapshot_by_id(snapshot_id):
 def add_video_generation(video_filename, video_path, snapshot_count,
                          start_time, end_time, fps, query_params=''):
     """Record a generated video in the database"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO video_generations 
-            (video_filename, video_path, snapshot_count, start_time, end_time, fps, query_params)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (video_filename, video_path, snapshot_count, start_time, end_time, fps, query_params))
-        conn.commit()
+        with conn:
+            cursor.execute('''
+                INSERT INTO video_generations 
+                (video_filename, video_path, snapshot_count, start_time, end_time, fps, query_params)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (video_filename, video_path, snapshot_count, start_time, end_time, fps, query_params))
         video_id = cursor.lastrowid
     return video_id
 
 
 def get_database_stats():
     """Get database statistics — Fix #8: combined into 2 queries instead of 5"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -523,75 +759,97 @@ def get_database_stats():
 
 # ==================== DELETE FUNCTIONS ====================
 
+# DELETE ... RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def _delete_returning(cursor, table, columns, where, params):
+    """Delete matching rows and return *columns* of the rows deleted.
+    One statement with RETURNING; SELECT then DELETE on older SQLite."""
+    if _HAS_RETURNING:
+        cursor.execute(f'DELETE FROM {table} WHERE {where} RETURNING {columns}', params)
+        return cursor.fetchall()
+    cursor.execute(f'SELECT {columns} FROM {table} WHERE {where}', params)
+    rows = cursor.fetchall()
+    if rows:
+        cursor.execute(f'DELETE FROM {table} WHERE {where}', params)
+    return rows
+
+
+def _remove_files(stored_paths, base_folder, kind='file'):
+    """Unlink files whose rows are already deleted, outside the write lock.
+    Several files are removed in parallel; missing files are ignored."""
+    def remove(stored_path):
+        if not stored_path:
+            return
+        path = _normalize_db_path(stored_path, base_folder)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove {kind} {path}: {e}")
+
+    if len(stored_paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(stored_paths))) as pool:
+            list(pool.map(remove, stored_paths))
+    else:
+        for stored_path in stored_paths:
+            remove(stored_path)
+
+
 def delete_snapshot(snapshot_id):
     """ลบ snapshot จากฐานข้อมูลและลบไฟล์"""
     from src.config import UPLOAD_FOLDER
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
 
-        # ดึงข้อมูล filepath ก่อนลบ
-        cursor.execute('SELECT filepath FROM snapshots WHERE id = ?', (snapshot_id,))
-        row = cursor.fetchone()
-
-        if row:
-            filepath = _normalize_db_path(row['filepath'], UPLOAD_FOLDER)
-            # ลบไฟล์ถ้ามีอยู่
-            try:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-            except OSError as e:
-                logger.warning(f"Could not remove file {filepath}: {e}")
-
-            # ลบจากฐานข้อมูล
-            cursor.execute('DELETE FROM snapshots WHERE id = ?', (snapshot_id,))
-            conn.commit()
-            return True, "ลบ snapshot สำเร็จ"
+        # ลบจากฐานข้อมูลและได้ filepath กลับมาในคำสั่งเดียว
+        with conn:
+            rows = _delete_returning(cursor, 'snapshots', 'filepath', 'id = ?', (snapshot_id,))
+    if not rows:
+        return False, "ไม่พบ snapshot"
+    _invalidate_filter_values()
 
-    return False, "ไม่พบ snapshot"
+    # ลบไฟล์หลังปล่อย connection แล้ว
+    _remove_files([rows[0]['filepath']], UPLOAD_FOLDER)
+    return True, "ลบ snapshot สำเร็จ"
 
 
 def delete_category(category_id):
     """ลบหมวดหมู่ (ถ้าไม่มี snapshot หรือหมวดหมู่ย่อยใช้อยู่)"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
 
         # ตรวจสอบว่ามี snapshot ใช้อยู่ไหม
-        cursor.execute('SELECT COUNT(*) FROM snapshots WHERE category_id = ?', (category_id,))
-        if cursor.fetchone()[0] > 0:
+        cursor.execute('SELECT EXISTS(SELECT 1 FROM snapshots WHERE category_id = ?)', (category_id,))
+        if cursor.fetchone()[0]:
             return False, "ไม่สามารถลบได้ มี snapshot ใช้หมวดหมู่นี้อยู่"
 
         # ตรวจสอบว่ามีหมวดหมู่ลูกไหม
-        cursor.execute('SELECT COUNT(*) FROM categories WHERE parent_id = ?', (category_id,))
-        if cursor.fetchone()[0] > 0:
+        cursor.execute('SELECT EXISTS(SELECT 1 FROM categories WHERE parent_id = ?)', (category_id,))
+        if cursor.fetchone()[0]:
             return False, "ไม่สามารถลบได้ มีหมวดหมู่ย่อยอยู่"
 
-        cursor.execute('DELETE FROM categories WHERE id = ?', (category_id,))
-        conn.commit()
+        with conn:
+            cursor.execute('DELETE FROM categories WHERE id = ?', (category_id,))
+    _invalidate_categories()
     return True, "ลบหมวดหมู่สำเร็จ"
 
 
 def delete_video(video_id):
     """ลบวิดีโอจากฐานข้อมูลและลบไฟล์"""
     from src.config import VIDEOS_FOLDER
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
 
-        cursor.execute('SELECT video_path FROM video_generations WHERE id = ?', (video_id,))
-        row = cursor.fetchone()
-
-        if row:
-            video_path = _normalize_db_path(row['video_path'], VIDEOS_FOLDER)
-            try:
-                if os.path.exists(video_path):
-                    os.remove(video_path)
-            except OSError as e:
-                logger.warning(f"Could not remove video file {video_path}: {e}")
-
-            cursor.execute('DELETE FROM video_generations WHERE id = ?', (video_id,))
-            conn.commit()
-            return True, "ลบวิดีโอสำเร็จ"
+        with conn:
+            rows = _delete_returning(cursor, 'video_generations', 'video_path', 'id = ?', (video_id,))
+    if not rows:
+        return False, "ไม่พบวิดีโอ"
 
-    return False, "ไม่พบวิดีโอ"
+    _remove_files([rows[0]['video_path']], VIDEOS_FOLDER, kind='video file')
+    return True, "ลบวิดีโอสำเร็จ"
 
 
 def delete_multiple_snapshots(snapshot_ids):
@@ -600,45 +858,30 @@ def delete_multiple_snapshots(snapshot_ids):
     if not snapshot_ids:
         return 0, []
 
-    deleted = 0
     errors = []
 
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
 
-        # Fetch all filepaths in one query
-        placeholders = ','.join('?' for _ in snapshot_ids)
-        cursor.execute(
-            f'SELECT id, filepath FROM snapshots WHERE id IN ({placeholders})',
-            list(snapshot_ids)
-        )
-        rows = cursor.fetchall()
-
-        found_ids = set()
-        for row in rows:
-            found_ids.add(row['id'])
-            filepath = _normalize_db_path(row['filepath'], UPLOAD_FOLDER)
-            try:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-            except OSError as e:
-                logger.warning(f"Could not remove file {filepath}: {e}")
-
-        # Delete all found snapshots in one statement
-        if found_ids:
-            id_list = list(found_ids)
-            placeholders = ','.join('?' for _ in id_list)
-            cursor.execute(
-                f'DELETE FROM snapshots WHERE id IN ({placeholders})',
-                id_list
+        # Delete and collect filepaths in one statement (ids bound as one JSON array)
+        with conn:
+            rows = _delete_returning(
+                cursor, 'snapshots', 'id, filepath',
+                'id IN (SELECT value FROM json_each(?))', (json.dumps(list(snapshot_ids)),)
             )
-            conn.commit()
-            deleted = cursor.rowcount
+        deleted = len(rows)
+        found_ids = {row['id'] for row in rows}
+
+    if rows:
+        _invalidate_filter_values()
 
-        # Report missing IDs
-        for sid in snapshot_ids:
-            if sid not in found_ids:
-                errors.append(f"ID {sid}: ไม่พบ snapshot")
+    # Files go after the commit, without holding the write connection
+    _remove_files([row['filepath'] for row in rows], UPLOAD_FOLDER)
+
+    # Report missing IDs
+    for sid in snapshot_ids:
+        if sid not in found_ids:
+            errors.append(f"ID {sid}: ไม่พบ snapshot")
 
     return deleted, errors
 
@@ -647,7 +890,7 @@ def delete_multiple_snapshots(snapshot_ids):
 
 def update_snapshot(snapshot_id, category_id=None, tags=None, notes=None, capture_time=None):
     """อัพเดทข้อมูล snapshot"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
 
         updates = []
@@ -672,8 +915,8 @@ def update_snapshot(snapshot_id, category_id=None, tags=None, notes=None, captur
         if updates:
             params.append(snapshot_id)
             query = f"UPDATE snapshots SET {', '.join(updates)} WHERE id = ?"
-            cursor.execute(query, params)
-            conn.commit()
+            with conn:
+                cursor.execute(query, params)
             return True, "อัพเดทสำเร็จ"
 
     return False, "ไม่มีข้อมูลที่จะอัพเดท"
@@ -681,7 +924,7 @@ def update_snapshot(snapshot_id, category_id=None, tags=None, notes=None, captur
 
 def update_category(category_id, name=None, description=None, parent_id=None):
     """อัพเดทข้อมูลหมวดหมู่"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
 
         updates = []
@@ -702,8 +945,9 @@ def update_category(category_id, name=None, description=None, parent_id=None):
         if updates:
             params.append(category_id)
             query = f"UPDATE categories SET {', '.join(updates)} WHERE id = ?"
-            cursor.execute(query, params)
-            conn.commit()
+            with conn:
+                cursor.execute(query, params)
+            _invalidate_categories()
             return True, "อัพเดทหมวดหมู่สำเร็จ"
 
     return False, "ไม่มีข้อมูลที่จะอัพเดท"
@@ -717,45 +961,48 @@ def cleanup_missing_files():
     deleted_count = 0
     batch_size = 500
 
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        # Process in batches to avoid loading everything into memory
-        offset = 0
-        ids_to_delete = []
-
-        while True:
-            cursor.execute(
-                'SELECT id, filepath FROM snapshots LIMIT ? OFFSET ?',
-                (batch_size, offset)
-            )
-            rows = cursor.fetchall()
-            if not rows:
-                break
-
-            for row in rows:
-                norm_path = _normalize_db_path(row['filepath'], UPLOAD_FOLDER)
-                if not os.path.exists(norm_path):
-                    ids_to_delete.append(row['id'])
-
-            offset += batch_size
+    # One directory walk instead of a stat() per row
+    existing = {
+        os.path.join(root, name)
+        for root, _, files in os.walk(UPLOAD_FOLDER)
+        for name in files
+    }
 
-        # Batch delete missing
-        if ids_to_delete:
-            placeholders = ','.join('?' for _ in ids_to_delete)
-            cursor.execute(
-                f'DELETE FROM snapshots WHERE id IN ({placeholders})',
-                ids_to_delete
-            )
-            conn.commit()
-            deleted_count = cursor.rowcount
+    # Stream (id, filepath) from a reader rather than paging with OFFSET;
+    # only the ids to delete are kept in memory
+    ids_to_delete = []
+    with get_read_db() as conn:
+        for snapshot_id, filepath in conn.execute('SELECT id, filepath FROM snapshots'):
+            if filepath in existing:
+                continue
+            # Stored elsewhere or in another OS's format: remap, and only
+            # stat files the walk couldn't have seen
+            if filepath:
+                norm_path = _remap_path(filepath, UPLOAD_FOLDER)
+                if norm_path in existing or os.path.exists(filepath) or os.path.exists(norm_path):
+                    continue
+            ids_to_delete.append(snapshot_id)
+
+    with get_write_db() as conn:
+        cursor = conn.cursor()
 
+        # Delete in fixed-size chunks with one prepared statement, committed
+        # as a single transaction
+        with conn:
+            for start in range(0, len(ids_to_delete), batch_size):
+                chunk = ids_to_delete[start:start + batch_size]
+                cursor.executemany('DELETE FROM snapshots WHERE id = ?', [(i,) for i in chunk])
+                deleted_count += cursor.rowcount
+
+    if deleted_count:
+        _invalidate_filter_values()
+        checkpoint_wal()
     return deleted_count
 
 
 def get_all_videos():
     """ดึงรายการวิดีโอทั้งหมด"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM video_generations ORDER BY created_at DESC')
         videos = cursor.fetchall()
@@ -764,7 +1011,7 @@ def get_all_videos():
 
 def get_video_by_id(video_id):
     """ดึงข้อมูลวิดีโอตาม ID"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM video_generations WHERE id = ?', (video_id,))
         video = cursor.fetchone()
@@ -773,16 +1020,23 @@ def get_video_by_id(video_id):
 
 def get_category_by_id(category_id):
     """ดึงข้อมูลหมวดหมู่ตาม ID"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM categories WHERE id = ?', (category_id,))
-        category = cursor.fetchone()
-    return category
+    return _categories()['by_id'].get(category_id)
 
 
 def search_snapshots(keyword):
     """ค้นหา snapshot จาก tags, notes, filename"""
-    with get_db() as conn:
+    # Trigrams need at least 3 characters; LIKE wildcards keep their old meaning
+    if _fts_enabled and len(keyword) >= 3 and '%' not in keyword and '_' not in keyword:
+        phrase = '"' + keyword.replace('"', '""') + '"'
+        with get_read_db() as conn:
+            return conn.execute('''
+                SELECT s.* FROM snapshots s
+                JOIN snapshots_fts f ON s.id = f.rowid
+                WHERE snapshots_fts MATCH ?
+                ORDER BY s.capture_time DESC
+            ''', (phrase,)).fetchall()
+
+    with get_read_db() as conn:
         cursor = conn.cursor()
         search_term = f'%{keyword}%'
         cursor.execute('''
@@ -798,7 +1052,7 @@ def search_snapshots(keyword):
 
 def get_category_snapshot_count():
     """นับจำนวน snapshot ในแต่ละหมวดหมู่"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT c.id, c.name, COUNT(s.id) as snapshot_count
@@ -811,67 +1065,83 @@ def get_category_snapshot_count():
     return result
 
 
-def get_distinct_projects():
-    """ดึงรายชื่อ Project ทั้งหมดที่ไม่ซ้ำกัน"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT DISTINCT project_name FROM snapshots 
+# --- Filter value cache ---
+# Distinct projects and cameras feed the filter dropdowns on every page but
+# only change when snapshots are added or removed. Same scheme as the
+# category cache: local writes invalidate, the TTL covers other processes.
+FILTER_VALUES_CACHE_TTL = 60
+_filter_values_cache = None
+_filter_values_lock = threading.Lock()
+
+
+def _load_filter_values():
+    """Read the distinct project names and camera ids in one statement."""
+    values = {'p': [], 'c': []}
+    with get_read_db() as conn:
+        cursor = conn.execute('''
+            SELECT 'p' AS k, project_name AS v FROM snapshots
             WHERE project_name IS NOT NULL AND project_name != ''
-            ORDER BY project_name
+            GROUP BY project_name
+            UNION ALL
+            SELECT 'c', camera_id FROM snapshots
+            WHERE camera_id IS NOT NULL AND camera_id != ''
+            GROUP BY camera_id
+            ORDER BY k, v
         ''')
-        result = [row['project_name'] for row in cursor.fetchall()]
-    return result
+        # Drain the cursor in one pass; sorted by v within each kind
+        for kind, value in cursor:
+            values[kind].append(value)
+    return {'projects': tuple(values['p']), 'cameras': tuple(values['c']),
+            'loaded': time.monotonic()}
+
+
+def _filter_values():
+    """Return the filter value cache, reloading it when missing or expired."""
+    global _filter_values_cache
+    cache = _filter_values_cache
+    if cache is None or time.monotonic() - cache['loaded'] > FILTER_VALUES_CACHE_TTL:
+        with _filter_values_lock:
+            cache = _filter_values_cache
+            if cache is None or time.monotonic() - cache['loaded'] > FILTER_VALUES_CACHE_TTL:
+                cache = _filter_values_cache = _load_filter_values()
+    return cache
+
+
+def _invalidate_filter_values():
+    """Drop the filter value cache after snapshots are added or removed."""
+    global _filter_values_cache
+    _filter_values_cache = None
+
+
+def get_distinct_projects():
+    """ดึงรายชื่อ Project ทั้งหมดที่ไม่ซ้ำกัน"""
+    return list(_filter_values()['projects'])
 
 
 def get_distinct_cameras():
     """ดึงรายชื่อ Camera ทั้งหมดที่ไม่ซ้ำกัน"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT DISTINCT camera_id FROM snapshots 
-            WHERE camera_id IS NOT NULL AND camera_id != ''
-            ORDER BY camera_id
-        ''')
-        result = [row['camera_id'] for row in cursor.fetchall()]
-    return result
+    return list(_filter_values()['cameras'])
 
 
 def get_cameras_by_project(project_name):
     """ดึงรายชื่อ Camera ในโปรเจกต์ที่ระบุ"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT DISTINCT camera_id FROM snapshots 
             WHERE project_name = ? AND camera_id IS NOT NULL AND camera_id != ''
             ORDER BY camera_id
         ''', (project_name,))
-        result = [row['camera_id'] for row in cursor.fetchall()]
+        result = [row[0] for row in cursor]
     return result
 
 
 def get_filter_options():
-    """ดึงตัวเลือก Filter ทั้งหมด (Projects และ Cameras) — single connection"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT DISTINCT project_name FROM snapshots 
-            WHERE project_name IS NOT NULL AND project_name != ''
-            ORDER BY project_name
-        ''')
-        projects = [row['project_name'] for row in cursor.fetchall()]
-
-        cursor.execute('''
-            SELECT DISTINCT camera_id FROM snapshots 
-            WHERE camera_id IS NOT NULL AND camera_id != ''
-            ORDER BY camera_id
-        ''')
-        cameras = [row['camera_id'] for row in cursor.fetchall()]
-
+    """ดึงตัวเลือก Filter ทั้งหมด (Projects และ Cameras) — served from cache"""
+    cache = _filter_values()
     return {
-        'projects': projects,
-        'cameras': cameras,
+        'projects': list(cache['projects']),
+        'cameras': list(cache['cameras']),
     }
 
 
@@ -5,17 +5,74 @@ Centralized Logging System
 บันทึก logs ลงไฟล์ + console
 """
 
+import atexit
 import logging
 import logging.handlers
+import queue
 from pathlib import Path
 from datetime import datetime
 from src.paths import ProjectPaths
 
+# Formatter ใช้ร่วมกันทุก logger (stateless จึงแชร์ได้)
+_FILE_FORMATTER = logging.Formatter(
+    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+# Console formatter (สั้นกว่า)
+_CONSOLE_FORMATTER = logging.Formatter(
+    fmt='%(levelname)s - %(name)s - %(message)s'
+)
+
+
+class _TargetQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler ที่ระบุว่า record นี้มาจาก logger ตัวไหน"""
+
+    def __init__(self, log_queue, target):
+        super().__init__(log_queue)
+        self.target = target
+
+    def prepare(self, record):
+        # prepare() returns a copy, so each logger a record propagates
+        # through gets its own tagged record
+        record = super().prepare(record)
+        record.log_target = self.target
+        return record
+
+
+class _DispatchHandler(logging.Handler):
+    """ส่ง record จาก queue ไปยัง file handler ของ logger นั้น + console"""
+
+    def __init__(self, handlers):
+        super().__init__()
+        self._handlers = handlers  # logger name -> [handlers]
+
+    def handle(self, record):
+        for handler in self._handlers.get(record.log_target, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
 
 class LoggerSetup:
-    """สร้างและจัดการ logger"""
+    """สร้างและจัดการ logger
+
+    Loggers only enqueue records; one background QueueListener thread does
+    the formatting and file/console writes, off the request/video threads.
+    """
     
     _loggers = {}
+    _handlers = {}
+    _queue = queue.SimpleQueue()
+    _listener = None
+
+    @classmethod
+    def _start_listener(cls):
+        """เริ่ม listener thread ครั้งแรกที่มีการสร้าง logger"""
+        if cls._listener is None:
+            cls._listener = logging.handlers.QueueListener(cls._queue, _DispatchHandler(cls._handlers))
+            cls._listener.start()
+            # flush ที่ค้างใน queue ก่อนปิดโปรแกรม
+            atexit.register(cls._listener.stop)
     
     @classmethod
     def setup_logger(cls, name, level=logging.INFO):
@@ -47,12 +104,6 @@ class LoggerSetup:
         # สร้าง log file path
         log_file = log_dir / f"{name}.log"
         
-        # Formatter
-        formatter = logging.Formatter(
-            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
         # File Handler - บันทึกลงไฟล์
         file_handler = logging.handlers.RotatingFileHandler(
             filename=log_file,
@@ -61,19 +112,17 @@ class LoggerSetup:
             encoding='utf-8'
         )
         file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(_FILE_FORMATTER)
         
         # Console Handler - แสดงใน terminal
         console_handler = logging.StreamHandler()
         console_handler.setLevel(level)
-        
-        # Console formatter (สั้นกว่า)
-        console_formatter = logging.Formatter(
-            fmt='%(levelname)s - %(name)s - %(message)s'
-        )
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        console_handler.setFormatter(_CONSOLE_FORMATTER)
+
+        # Logger แค่ใส่ record ลง queue — listener เป็นคนเขียนจริง
+        cls._handlers[name] = [file_handler, console_handler]
+        logger.addHandler(_TargetQueueHandler(cls._queue, name))
+        cls._start_listener()
         
         # เก็บ logger ไว้ใช้ต่อ
         cls._loggers[name] = logger
@@ -73,6 +73,13 @@ class ProjectPaths:
         return True
 
 
+# resolve() ของ data directories คำนวณครั้งเดียว (resolve ต้อง stat ทุก level)
+_RESOLVED_ROOTS = {
+    p: str(p.resolve())
+    for p in (ProjectPaths.SNAPSHOTS, ProjectPaths.VIDEOS, ProjectPaths.LOGS, ProjectPaths.CACHE)
+}
+
+
 def get_snapshots_dir():
     """ได้ snapshots folder path"""
     return ProjectPaths.SNAPSHOTS
@@ -114,21 +121,23 @@ def safe_join(base_path, *parts):
     Returns:
         Path object ที่ safe (ไม่เลยออกจาก base)
     """
-    base = Path(base_path).resolve()
-    result = base
-    
-    for part in parts:
-        # ลบ .. เพื่อป้องกัน directory traversal
-        part = str(part).replace("..", "").lstrip("/").lstrip("\\")
-        result = result / part
-    
-    # ตรวจสอบว่าไม่ได้เลยออกจาก base
-    try:
-        result.resolve().relative_to(base)
-    except ValueError:
-        raise ValueError(f"Path traversal attempt detected: {parts}")
-    
-    return result
+    base_path = Path(base_path)
+    base = _RESOLVED_ROOTS.get(base_path)
+    if base is None:
+        base = str(base_path.resolve())
+
+    # ลบ .. เพื่อป้องกัน directory traversal
+    cleaned = [str(part).replace("..", "").lstrip("/").lstrip("\\") for part in parts]
+    result = os.path.normpath(os.path.join(base, *cleaned))
+
+    # ตรวจสอบว่าไม่ได้เลยออกจาก base — ทั้ง path ที่ join แล้ว และหลัง
+    # resolve symlink (symlink ใน base ที่ชี้ออกไปข้างนอกก็ไม่ผ่าน)
+    prefix = os.path.join(base, '')
+    for candidate in (result, os.path.realpath(result)):
+        if candidate != base and not candidate.startswith(prefix):
+            raise ValueError(f"Path traversal attempt detected: {parts}")
+
+    return Path(result)
 
 
 if __name__ == "__main__":
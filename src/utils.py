@@ -2,7 +2,9 @@ import os
 import re
 import uuid
 import hashlib
+import mmap
 from datetime import datetime
+from functools import lru_cache
 from PIL import Image
 from src.config import ALLOWED_EXTENSIONS
 from src.logger import get_logger
@@ -15,6 +17,9 @@ STRICT_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png'}
 # Maximum file size in bytes (20 MB)
 MAX_UPLOAD_SIZE_BYTES = 20 * 1024 * 1024
 
+# Files up to this size are hashed from one mmap in a single update() call
+MMAP_HASH_MAX_BYTES = 64 * 1024 * 1024
+
 
 def allowed_file(filename):
     """Check if file has an allowed extension"""
@@ -28,15 +33,29 @@ def allowed_file_strict(filename):
            filename.rsplit('.', 1)[1].lower() in STRICT_IMAGE_EXTENSIONS
 
 
+def _sha256_stream(f):
+    """SHA-256 hex digest of binary file object f from its current position.
+    hashlib.file_digest reads into a reused buffer (and hashes a BytesIO's
+    buffer without a copy); chunked reads on Python < 3.11."""
+    if hasattr(hashlib, 'file_digest'):
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+    sha256 = hashlib.sha256()
+    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
 def compute_file_hash(filepath):
     """Compute SHA-256 hash of a file for duplicate detection.
-    Reads file in chunks to handle large files efficiently."""
-    sha256 = hashlib.sha256()
+    Maps files up to MMAP_HASH_MAX_BYTES and hashes them in one call;
+    larger (or empty) files are streamed."""
     try:
         with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+            size = os.fstat(f.fileno()).st_size
+            if 0 < size <= MMAP_HASH_MAX_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return hashlib.sha256(mm).hexdigest()
+            return _sha256_stream(f)
     except Exception as e:
         logger.warning(f"Error computing file hash: {e}")
         return None
@@ -46,6 +65,18 @@ def compute_data_hash(data_bytes):
     """Compute SHA-256 hash from raw bytes (e.g., from an uploaded file stream)."""
     return hashlib.sha256(data_bytes).hexdigest()
 
+
+def compute_stream_hash(stream):
+    """Compute SHA-256 hash of a seekable upload stream without reading it into
+    a bytes object; the stream is rewound before and after hashing."""
+    stream.seek(0)
+    try:
+        # No fileno()/mmap here: on werkzeug's SpooledTemporaryFile that
+        # would roll an in-memory upload over to a temp file on disk
+        return _sha256_stream(stream)
+    finally:
+        stream.seek(0)
+
 def generate_unique_filename(original_filename):
     """Generate a unique filename to avoid conflicts"""
     ext = original_filename.rsplit('.', 1)[1].lower()
@@ -70,6 +101,32 @@ def format_file_size(size_bytes):
         size_bytes /= 1024.0
     return f"{size_bytes:.2f} PB"
 
+# Formats accepted by parse_datetime, tried in order
+_DATETIME_FORMATS = (
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d %H:%M',
+    '%Y/%m/%d',
+    '%d-%m-%Y %H:%M:%S',
+    '%d-%m-%Y %H:%M',
+    '%d-%m-%Y',
+)
+
+# The zero-padded subset of the '%Y-%m-%d ...' formats (what the DB and the
+# datetime-local inputs produce); datetime.fromisoformat parses these directly
+_ISO_DATETIME_RE = re.compile(r'\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2}(?::\d{2}(?:\.(?:\d{3}|\d{6}))?)?)?')
+
+# Filename timestamp patterns, tried in order (first match of each)
+_FILENAME_DATETIME_RES = (
+    re.compile(r'(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})'),  # 20240123_143000
+    re.compile(r'(\d{4})-(\d{2})-(\d{2})_(\d{2})-(\d{2})-(\d{2})'),  # 2024-01-23_14-30-00
+)
+
+
+@lru_cache(maxsize=4096)
 def parse_datetime(datetime_str):
     """Parse datetime string in various formats"""
     if not datetime_str:
@@ -78,20 +135,13 @@ def parse_datetime(datetime_str):
     # Normalise the ISO 'T' separator so the standard formats work
     datetime_str = datetime_str.strip().replace('T', ' ')
 
-    formats = [
-        '%Y-%m-%d %H:%M:%S.%f',
-        '%Y-%m-%d %H:%M:%S',
-        '%Y-%m-%d %H:%M',
-        '%Y-%m-%d',
-        '%Y/%m/%d %H:%M:%S',
-        '%Y/%m/%d %H:%M',
-        '%Y/%m/%d',
-        '%d-%m-%Y %H:%M:%S',
-        '%d-%m-%Y %H:%M',
-        '%d-%m-%Y',
-    ]
-    
-    for fmt in formats:
+    if _ISO_DATETIME_RE.fullmatch(datetime_str):
+        try:
+            return datetime.fromisoformat(datetime_str)
+        except ValueError:
+            return None  # e.g. month 13 — no other format could match either
+
+    for fmt in _DATETIME_FORMATS:
         try:
             return datetime.strptime(datetime_str, fmt)
         except ValueError:
@@ -100,32 +150,18 @@ def parse_datetime(datetime_str):
     # If no format works, return None
     return None
 
+@lru_cache(maxsize=4096)
 def extract_datetime_from_filename(filename):
     """Attempt to extract datetime from filename"""
-    # Common patterns: 20240123_143000, 2024-01-23_14-30-00, etc.
-    
-    patterns = [
-        r'(\d{8})_(\d{6})',  # 20240123_143000
-        r'(\d{4})-(\d{2})-(\d{2})_(\d{2})-(\d{2})-(\d{2})',  # 2024-01-23_14-30-00
-        r'(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})',  # 20240123143000
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, filename)
+    # Common patterns: 20240123_143000, 2024-01-23_14-30-00
+    for pattern in _FILENAME_DATETIME_RES:
+        match = pattern.search(filename)
         if match:
-            groups = match.groups()
             try:
-                if len(groups) == 2:  # Format: 20240123_143000
-                    date_str = groups[0]
-                    time_str = groups[1]
-                    dt_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]} {time_str[:2]}:{time_str[2:4]}:{time_str[4:6]}"
-                    return datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S')
-                elif len(groups) == 6:
-                    dt_str = f"{groups[0]}-{groups[1]}-{groups[2]} {groups[3]}:{groups[4]}:{groups[5]}"
-                    return datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S')
+                return datetime(*map(int, match.groups()))
             except ValueError:
                 continue
-    
+
     return None
 
 def create_thumbnail(image_path, thumbnail_path, size=(300, 300)):
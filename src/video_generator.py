@@ -1,21 +1,31 @@
 import cv2
+import json
 import os
+import re
 import threading
+import time
 import numpy as np
 import subprocess
 import shutil
+import tempfile
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from PIL import Image
 from src.config import VIDEOS_FOLDER, VIDEO_FPS
+from src.paths import ProjectPaths
 from src.logger import get_logger
 
 # Get logger for this module
 logger = get_logger('video_generator')
 
 # Global progress tracking for video generation jobs
-# Protected by a lock (Fix #3)
+# Protected by a lock (Fix #3). Bounded: jobs that never call clear_progress
+# (failed jobs, crashes) are evicted oldest-first past MAX_PROGRESS_ENTRIES
+MAX_PROGRESS_ENTRIES = 1024
 _progress_lock = threading.Lock()
-video_progress = {}
+video_progress = OrderedDict()
 
 
 def update_progress(job_id, current, total, status='processing'):
@@ -28,6 +38,32 @@ def update_progress(job_id, current, total, status='processing'):
                 'percent': int((current / total) * 100) if total > 0 else 0,
                 'status': status
             }
+            video_progress.move_to_end(job_id)
+            while len(video_progress) > MAX_PROGRESS_ENTRIES:
+                video_progress.popitem(last=False)
+
+
+# Per-frame progress is throttled: at most ~PROGRESS_UPDATES_PER_JOB steps,
+# plus whenever PROGRESS_INTERVAL seconds have passed, plus the last frame
+PROGRESS_UPDATES_PER_JOB = 200
+PROGRESS_INTERVAL = 0.1
+
+
+def _frame_progress(job_id, total):
+    """Return report(n) that forwards frame progress to update_progress, throttled."""
+    step = max(1, total // PROGRESS_UPDATES_PER_JOB)
+    last_update = 0.0
+
+    def report(n):
+        nonlocal last_update
+        if not job_id:
+            return
+        now = time.monotonic()
+        if n == total or n % step == 0 or now - last_update >= PROGRESS_INTERVAL:
+            update_progress(job_id, n, total, 'processing')
+            last_update = now
+
+    return report
 
 
 def get_progress(job_id):
@@ -46,55 +82,342 @@ def clear_progress(job_id):
 _codec_cache = None
 _codec_cache_lock = threading.Lock()
 
+# Probe result persisted across process starts, keyed by the OpenCV version
+CODEC_CACHE_FILE = ProjectPaths.CACHE / 'codec.json'
+
+# Try different codecs in order of preference
+_CODECS_TO_TRY = (
+    ('XVID', '.avi'),
+    ('MJPG', '.avi'),
+    ('mp4v', '.mp4'),
+    ('DIVX', '.avi'),
+    ('WMV1', '.wmv'),
+)
+
+
+def _opencv_has_ffmpeg():
+    """True when this OpenCV build has the FFMPEG Video I/O backend."""
+    try:
+        return re.search(r'^\s*FFMPEG:\s*YES', cv2.getBuildInformation(), re.M) is not None
+    except Exception:
+        return False
+
+
+def _load_codec_cache():
+    try:
+        with open(CODEC_CACHE_FILE, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('opencv') == cv2.__version__:
+            return cached['codec'], cached['ext']
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return None
+
+
+def _save_codec_cache(codec, ext):
+    try:
+        CODEC_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(CODEC_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'opencv': cv2.__version__, 'codec': codec, 'ext': ext}, f)
+    except OSError as e:
+        logger.debug(f"Could not write codec cache: {e}")
+
+
+def _probe_video_codec():
+    """Open a tiny test writer per codec until one works; (codec, ext) or None."""
+    os.makedirs(VIDEOS_FOLDER, exist_ok=True)
+    test_base = os.path.join(VIDEOS_FOLDER, '_codec_test')
+
+    for codec, ext in _CODECS_TO_TRY:
+        test_path = test_base + ext
+        try:
+            test_writer = cv2.VideoWriter(test_path, cv2.VideoWriter_fourcc(*codec), 1, (100, 100))
+            opened = test_writer.isOpened()
+            test_writer.release()
+            if opened:
+                return codec, ext
+        except Exception as e:
+            logger.warning(f"Codec {codec} failed: {e}")
+        finally:
+            try:
+                os.remove(test_path)
+            except OSError:
+                pass
+    return None
+
 
 def get_video_codec():
     """
     Get the best available video codec for the system.
-    Caches the result after first probe (Fix #7).
+    Caches the result after first probe (Fix #7), in memory and in
+    CODEC_CACHE_FILE. OpenCV builds with the FFMPEG backend skip the probe
+    and use the first preference directly.
     """
     global _codec_cache
-    
+
     with _codec_cache_lock:
         if _codec_cache is not None:
             return _codec_cache
 
-    # Try different codecs in order of preference
-    codecs_to_try = [
-        ('XVID', '.avi'),
-        ('MJPG', '.avi'),
-        ('mp4v', '.mp4'),
-        ('DIVX', '.avi'),
-        ('WMV1', '.wmv'),
-    ]
+    if _opencv_has_ffmpeg():
+        codec, ext = _CODECS_TO_TRY[0]
+    else:
+        cached = _load_codec_cache()
+        if cached is not None:
+            codec, ext = cached
+        else:
+            probed = _probe_video_codec()
+            if probed is not None:
+                codec, ext = probed
+                _save_codec_cache(codec, ext)
+            else:
+                # Default fallback (not persisted, so the next start probes again)
+                logger.info("Using fallback codec: MJPG")
+                codec, ext = 'MJPG', '.avi'
+
+    logger.info(f"Using video codec: {codec}")
+    result = (cv2.VideoWriter_fourcc(*codec), ext)
+    with _codec_cache_lock:
+        _codec_cache = result
+    return result
 
-    os.makedirs(VIDEOS_FOLDER, exist_ok=True)
 
-    for codec, ext in codecs_to_try:
-        try:
-            fourcc = cv2.VideoWriter_fourcc(*codec)
-            test_path = os.path.join(VIDEOS_FOLDER, '_codec_test' + ext)
-            test_writer = cv2.VideoWriter(test_path, fourcc, 1, (100, 100))
-            if test_writer.isOpened():
-                test_writer.release()
-                if os.path.exists(test_path):
-                    os.remove(test_path)
-                logger.info(f"Using video codec: {codec}")
-                result = (fourcc, ext)
-                with _codec_cache_lock:
-                    _codec_cache = result
-                return result
-            if os.path.exists(test_path):
-                os.remove(test_path)
-        except Exception as e:
-            logger.warning(f"Codec {codec} failed: {e}")
-            continue
+# --- ffmpeg encoding (optional) ---
+# With an ffmpeg binary on PATH, raw BGR frames are piped straight into it
+# and encoded to H.264 — on a hardware encoder when one works here, else
+# libx264. Without ffmpeg, OpenCV's VideoWriter is used as before.
+_FFMPEG_ENCODERS = ('h264_nvenc', 'h264_qsv', 'h264_videotoolbox', 'libx264')
+_ffmpeg_cache = None  # (ffmpeg_path, encoder), or False when unavailable
+
+
+def get_ffmpeg_encoder():
+    """
+    Find ffmpeg and the first H.264 encoder that can actually encode.
+    Returns (ffmpeg_path, encoder) or None; probed once and cached.
+    """
+    global _ffmpeg_cache
 
-    # Default fallback
-    logger.info("Using fallback codec: MJPG")
-    result = (cv2.VideoWriter_fourcc(*'MJPG'), '.avi')
     with _codec_cache_lock:
-        _codec_cache = result
-    return result
+        if _ffmpeg_cache is not None:
+            return _ffmpeg_cache or None
+
+    result = False
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg:
+        for encoder in _FFMPEG_ENCODERS:
+            # Listed encoders can still fail (no GPU/driver) — encode one frame
+            try:
+                probe = subprocess.run(
+                    [ffmpeg, '-hide_banner', '-loglevel', 'error',
+                     '-f', 'lavfi', '-i', 'color=c=black:s=64x64', '-frames:v', '1',
+                     '-c:v', encoder, '-f', 'null', '-'],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.warning(f"ffmpeg encoder {encoder} failed: {e}")
+                continue
+            if probe.returncode == 0:
+                logger.info(f"Using ffmpeg encoder: {encoder}")
+                result = (ffmpeg, encoder)
+                break
+
+    with _codec_cache_lock:
+        _ffmpeg_cache = result
+    return result or None
+
+
+class EncoderError(RuntimeError):
+    """The encoder stopped accepting frames; the video cannot be completed."""
+
+
+class FfmpegWriter:
+    """
+    Drop-in for cv2.VideoWriter that pipes frames to an ffmpeg process.
+    write() raises EncoderError once ffmpeg has gone away, and release()
+    returns False (after logging ffmpeg's stderr) if the encode failed.
+    """
+
+    def __init__(self, ffmpeg, encoder, output_path, fps, frame_size):
+        width, height = frame_size
+        cmd = [
+            ffmpeg, '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}',
+            '-r', str(fps), '-i', '-',
+            # yuv420p needs even dimensions; pad odd ones by a pixel
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+            '-c:v', encoder, '-pix_fmt', 'yuv420p',
+        ]
+        if encoder == 'libx264':
+            cmd += ['-preset', 'veryfast']
+        cmd += ['-movflags', '+faststart', output_path]
+        self.output_path = output_path
+        self._failed = False
+        # stderr goes to a file, not a pipe, so a chatty ffmpeg can never
+        # block on a full pipe while we are blocked writing frames
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=self._stderr)
+        except OSError:
+            self._stderr.close()
+            raise
+
+    def isOpened(self):
+        return self._proc.poll() is None
+
+    def write(self, img):
+        if self._failed:
+            raise EncoderError(f"ffmpeg is no longer running for {self.output_path}")
+        # One write per frame straight from the array buffer
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(img).data)
+        except (BrokenPipeError, ValueError) as e:
+            self._failed = True
+            raise EncoderError(f"ffmpeg stopped accepting frames for {self.output_path}") from e
+
+    def release(self):
+        """Finish the encode; True if ffmpeg exited cleanly after all frames."""
+        if self._proc.stdin and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                self._failed = True
+        returncode = self._proc.wait()
+        ok = returncode == 0 and not self._failed
+        if not ok:
+            self._stderr.seek(0)
+            stderr = self._stderr.read()[-4000:].decode('utf-8', 'replace').strip()
+            logger.error(f"ffmpeg failed (exit code {returncode}) for {self.output_path}: "
+                         f"{stderr or 'no error output'}")
+        self._stderr.close()
+        return ok
+
+
+_MJPG_FOURCC = cv2.VideoWriter_fourcc(*'MJPG')
+
+
+def _finish_video(video_writer, output_path):
+    """
+    Release the writer and check its output file.
+
+    Returns:
+        None on success, else an error message; the partial file is removed
+    """
+    # FfmpegWriter.release reports a failed encode; cv2's returns None
+    if video_writer.release() is False:
+        error = "Video encoding failed"
+    elif os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        return None
+    else:
+        error = "Video file was not created or is empty"
+    try:
+        os.remove(output_path)
+    except OSError:
+        pass
+    return error
+
+
+def _open_video_writer(output_filename, fps, frame_size):
+    """
+    Open a writer for output_filename (extension chosen by the encoder).
+
+    Returns:
+        tuple: (writer, output_path), or (None, None) if nothing could be opened
+    """
+    output_base = os.path.splitext(output_filename)[0]
+
+    ffmpeg = get_ffmpeg_encoder()
+    if ffmpeg:
+        output_path = os.path.join(VIDEOS_FOLDER, output_base + '.mp4')
+        try:
+            video_writer = FfmpegWriter(*ffmpeg, output_path, fps, frame_size)
+            if video_writer.isOpened():
+                return video_writer, output_path
+        except OSError as e:
+            logger.warning(f"Could not start ffmpeg, using OpenCV writer: {e}")
+
+    fourcc, ext = get_video_codec()
+    output_path = os.path.join(VIDEOS_FOLDER, output_base + ext)
+    video_writer = cv2.VideoWriter(output_path, fourcc, fps, frame_size)
+
+    if not video_writer.isOpened():
+        output_path = os.path.join(VIDEOS_FOLDER, output_base + '.avi')
+        video_writer = cv2.VideoWriter(output_path, _MJPG_FOURCC, fps, frame_size)
+
+        if not video_writer.isOpened():
+            return None, None
+
+    return video_writer, output_path
+
+
+# --- Frame prefetching ---
+# cv2.imread releases the GIL, so a few threads decode upcoming frames while
+# the main thread resizes/annotates and writes the current one.
+PREFETCH_WORKERS = 4
+PREFETCH_WINDOW = 8
+
+
+# Linux: ask for aggressive readahead, then drop the pages once decoded —
+# each snapshot is read exactly once per video
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+
+def _fast_imread(img_path):
+    """
+    Read a file in one call and decode it with cv2.imdecode.
+    Same result as cv2.imread (incl. EXIF orientation); None if unreadable.
+    """
+    try:
+        with open(img_path, 'rb') as f:
+            fd = f.fileno()
+            if _HAS_FADVISE:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            data = f.read()
+            if _HAS_FADVISE:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        return None
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _read_image(img_path):
+    """_fast_imread that logs and returns None instead of raising."""
+    try:
+        return _fast_imread(img_path)
+    except Exception as e:
+        logger.error(f"Error reading image {img_path}: {e}")
+        return None
+
+
+def _prefetch_images(img_paths):
+    """
+    Yield decoded images in order, keeping up to PREFETCH_WINDOW frames
+    in flight. Unreadable files yield None, like cv2.imread.
+    """
+    paths = iter(img_paths)
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+        pending = deque(executor.submit(_read_image, p) for p in islice(paths, PREFETCH_WINDOW))
+        while pending:
+            img = pending.popleft().result()
+            for p in islice(paths, 1):
+                pending.append(executor.submit(_read_image, p))
+            yield img
+
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _resize_frame(img, frame_size):
+    """
+    Resize img to frame_size (width, height): INTER_AREA when shrinking
+    (faster, no aliasing), INTER_LINEAR when enlarging.
+    """
+    width, height = frame_size
+    if img.shape[1] >= width and img.shape[0] >= height:
+        interpolation = cv2.INTER_AREA
+    else:
+        interpolation = cv2.INTER_LINEAR
+    return cv2.resize(img, frame_size, interpolation=interpolation)
 
 
 def create_timelapse_video(snapshot_paths, output_filename, fps=VIDEO_FPS, job_id=None):
@@ -117,64 +440,103 @@ def create_timelapse_video(snapshot_paths, output_filename, fps=VIDEO_FPS, job_i
 
     try:
         os.makedirs(VIDEOS_FOLDER, exist_ok=True)
-        output_path = os.path.join(VIDEOS_FOLDER, output_filename)
 
         update_progress(job_id, 0, total_images, 'preparing')
 
-        first_img = cv2.imread(snapshot_paths[0])
+        first_img = _fast_imread(snapshot_paths[0])
         if first_img is None:
             return False, None, f"Could not read first image: {snapshot_paths[0]}"
 
         height, width, layers = first_img.shape
-
-        fourcc, ext = get_video_codec()
-
-        output_base = os.path.splitext(output_filename)[0]
-        output_path = os.path.join(VIDEOS_FOLDER, output_base + ext)
-
-        video_writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-        if not video_writer.isOpened():
-            fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-            output_path = os.path.join(VIDEOS_FOLDER, output_base + '.avi')
-            video_writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-            if not video_writer.isOpened():
-                return False, None, "Failed to initialize video writer"
-
-        for i, img_path in enumerate(snapshot_paths):
+        # Only its size is needed; don't keep a full frame alive for the whole job
+        del first_img
+
+        frame_size = (width, height)
+        frame_shape = (height, width)
+        video_writer, output_path = _open_video_writer(output_filename, fps, frame_size)
+        if video_writer is None:
+            return False, None, "Failed to initialize video writer"
+
+        report_progress = _frame_progress(job_id, total_images)
+        frames = _prefetch_images(snapshot_paths)
+        for n, (img_path, img) in enumerate(zip(snapshot_paths, frames), 1):
             try:
-                update_progress(job_id, i + 1, total_images, 'processing')
-
-                img = cv2.imread(img_path)
+                report_progress(n)
 
                 if img is None:
                     logger.warning(f"Could not read image {img_path}, skipping...")
                     continue
 
-                if img.shape[0] != height or img.shape[1] != width:
-                    img = cv2.resize(img, (width, height))
+                if img.shape[:2] != frame_shape:
+                    img = _resize_frame(img, frame_size)
 
                 video_writer.write(img)
 
+            except EncoderError as e:
+                logger.error(str(e))
+                break
+
             except Exception as e:
                 logger.error(f"Error processing image {img_path}: {e}")
                 continue
 
-        video_writer.release()
+        error = _finish_video(video_writer, output_path)
 
         update_progress(job_id, total_images, total_images, 'encoding')
 
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if error is None:
             update_progress(job_id, total_images, total_images, 'complete')
             return True, output_path, None
         else:
-            return False, None, "Video file was not created or is empty"
+            return False, None, error
 
     except Exception as e:
         return False, None, f"Error creating video: {str(e)}"
 
 
+def _draw_timestamp(img, capture_time):
+    # Darken only the label box (same result as blending a
+    # black rectangle at 0.6 over the whole frame)
+    box = img[10:61, 10:401]
+    cv2.convertScaleAbs(box, dst=box, alpha=0.4)
+
+    cv2.putText(img, capture_time.strftime(TIMESTAMP_FORMAT), (20, 45),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+
+def _make_overlay_drawer(show_timestamp, show_info, height):
+    """
+    Pick the overlay step once per video instead of testing the flags per frame.
+
+    Returns:
+        draw(img, capture_time, info) that annotates img in place, or None
+        when neither overlay is enabled
+    """
+    info_origin = (20, height - 20)
+
+    def draw_info(img, info):
+        cv2.putText(img, str(info), info_origin,
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+
+    if show_timestamp and show_info:
+        def draw(img, capture_time, info):
+            if capture_time:
+                _draw_timestamp(img, capture_time)
+            if info:
+                draw_info(img, info)
+    elif show_timestamp:
+        def draw(img, capture_time, info):
+            if capture_time:
+                _draw_timestamp(img, capture_time)
+    elif show_info:
+        def draw(img, capture_time, info):
+            if info:
+                draw_info(img, info)
+    else:
+        return None
+    return draw
+
+
 def create_timelapse_with_timestamps(snapshot_data, output_filename, fps=VIDEO_FPS,
                                      show_timestamp=True, show_info=True, job_id=None):
     """
@@ -198,77 +560,61 @@ def create_timelapse_with_timestamps(snapshot_data, output_filename, fps=VIDEO_F
 
     try:
         os.makedirs(VIDEOS_FOLDER, exist_ok=True)
-        output_path = os.path.join(VIDEOS_FOLDER, output_filename)
 
         update_progress(job_id, 0, total_images, 'preparing')
 
-        first_img = cv2.imread(snapshot_data[0][0])
+        first_img = _fast_imread(snapshot_data[0][0])
         if first_img is None:
             return False, None, f"Could not read first image: {snapshot_data[0][0]}"
 
         height, width, layers = first_img.shape
-
-        fourcc, ext = get_video_codec()
-
-        output_base = os.path.splitext(output_filename)[0]
-        output_path = os.path.join(VIDEOS_FOLDER, output_base + ext)
-
-        video_writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-        if not video_writer.isOpened():
-            fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-            output_path = os.path.join(VIDEOS_FOLDER, output_base + '.avi')
-            video_writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-            if not video_writer.isOpened():
-                return False, None, "Failed to initialize video writer"
-
-        for i, data in enumerate(snapshot_data):
+        # Only its size is needed; don't keep a full frame alive for the whole job
+        del first_img
+
+        frame_size = (width, height)
+        frame_shape = (height, width)
+        video_writer, output_path = _open_video_writer(output_filename, fps, frame_size)
+        if video_writer is None:
+            return False, None, "Failed to initialize video writer"
+
+        draw_overlays = _make_overlay_drawer(show_timestamp, show_info, height)
+        report_progress = _frame_progress(job_id, total_images)
+        frames = _prefetch_images(data[0] for data in snapshot_data)
+        for n, (data, img) in enumerate(zip(snapshot_data, frames), 1):
             try:
-                update_progress(job_id, i + 1, total_images, 'processing')
-
-                img_path = data[0]
-                capture_time = data[1] if len(data) > 1 else None
-                info = data[2] if len(data) > 2 else None
-
-                img = cv2.imread(img_path)
+                report_progress(n)
 
                 if img is None:
-                    logger.warning(f"Could not read image {img_path}, skipping...")
+                    logger.warning(f"Could not read image {data[0]}, skipping...")
                     continue
 
-                if img.shape[0] != height or img.shape[1] != width:
-                    img = cv2.resize(img, (width, height))
+                if img.shape[:2] != frame_shape:
+                    img = _resize_frame(img, frame_size)
 
-                if show_timestamp and capture_time:
-                    timestamp_text = capture_time.strftime('%Y-%m-%d %H:%M:%S')
-
-                    overlay = img.copy()
-                    cv2.rectangle(overlay, (10, 10), (400, 60), (0, 0, 0), -1)
-                    img = cv2.addWeighted(overlay, 0.6, img, 0.4, 0)
-
-                    cv2.putText(img, timestamp_text, (20, 45),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-
-                if show_info and info:
-                    cv2.putText(img, str(info), (20, height - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+                if draw_overlays is not None:
+                    draw_overlays(img,
+                                  data[1] if len(data) > 1 else None,
+                                  data[2] if len(data) > 2 else None)
 
                 video_writer.write(img)
 
+            except EncoderError as e:
+                logger.error(str(e))
+                break
+
             except Exception as e:
                 logger.error(f"Error processing image: {e}")
                 continue
 
-        video_writer.release()
+        error = _finish_video(video_writer, output_path)
 
         update_progress(job_id, total_images, total_images, 'encoding')
 
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if error is None:
             update_progress(job_id, total_images, total_images, 'complete')
             return True, output_path, None
         else:
-            return False, None, "Video file was not created or is empty"
+            return False, None, error
 
     except Exception as e:
         return False, None, f"Error creating video: {str(e)}"
@@ -291,70 +637,60 @@ def create_comparison_video(snapshot_groups, output_filename, fps=VIDEO_FPS):
 
     try:
         os.makedirs(VIDEOS_FOLDER, exist_ok=True)
-        output_path = os.path.join(VIDEOS_FOLDER, output_filename)
 
         max_length = max(len(group) for group in snapshot_groups)
         num_groups = len(snapshot_groups)
 
-        first_images = []
-        for group in snapshot_groups:
-            if group:
-                img = cv2.imread(group[0])
-                if img is not None:
-                    first_images.append(img)
+        # Frame size comes from the first readable first image; only its
+        # shape is kept, not one decoded frame per group for the whole job
+        sample_shape = next(
+            (img.shape[:2] for img in (cv2.imread(group[0]) for group in snapshot_groups if group)
+             if img is not None),
+            None)
 
-        if not first_images:
+        if sample_shape is None:
             return False, None, "Could not read any images"
 
-        sample_height, sample_width = first_images[0].shape[:2]
+        sample_height, sample_width = sample_shape
         output_width = sample_width * num_groups
         output_height = sample_height
 
-        fourcc, ext = get_video_codec()
+        video_writer, output_path = _open_video_writer(
+            output_filename, fps, (output_width, output_height))
+        if video_writer is None:
+            return False, None, "Failed to initialize video writer"
 
-        output_base = os.path.splitext(output_filename)[0]
-        output_path = os.path.join(VIDEOS_FOLDER, output_base + ext)
-
-        video_writer = cv2.VideoWriter(output_path, fourcc, fps,
-                                       (output_width, output_height))
-
-        if not video_writer.isOpened():
-            fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-            output_path = os.path.join(VIDEOS_FOLDER, output_base + '.avi')
-            video_writer = cv2.VideoWriter(output_path, fourcc, fps,
-                                           (output_width, output_height))
-
-            if not video_writer.isOpened():
-                return False, None, "Failed to initialize video writer"
+        # One output buffer for every frame; each group fills its own column
+        combined_frame = np.empty((output_height, output_width, 3), dtype=np.uint8)
 
         for frame_idx in range(max_length):
-            combined_frame = None
-
             for group_idx, group in enumerate(snapshot_groups):
+                tile = combined_frame[:, group_idx * sample_width:(group_idx + 1) * sample_width]
                 img_idx = min(frame_idx, len(group) - 1) if group else 0
 
+                img = None
                 if group and img_idx < len(group):
                     img = cv2.imread(group[img_idx])
-                    if img is not None:
-                        img = cv2.resize(img, (sample_width, sample_height))
-                    else:
-                        img = np.zeros((sample_height, sample_width, 3), dtype=np.uint8)
-                else:
-                    img = np.zeros((sample_height, sample_width, 3), dtype=np.uint8)
 
-                if combined_frame is None:
-                    combined_frame = img
+                if img is None:
+                    tile[:] = 0
+                elif img.shape[:2] == (sample_height, sample_width):
+                    tile[:] = img
                 else:
-                    combined_frame = np.hstack((combined_frame, img))
+                    tile[:] = _resize_frame(img, (sample_width, sample_height))
 
-            video_writer.write(combined_frame)
+            try:
+                video_writer.write(combined_frame)
+            except EncoderError as e:
+                logger.error(str(e))
+                break
 
-        video_writer.release()
+        error = _finish_video(video_writer, output_path)
 
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        if error is None:
             return True, output_path, None
         else:
-            return False, None, "Video file was not created or is empty"
+            return False, None, error
 
     except Exception as e:
         return False, None, f"Error creating comparison video: {str(e)}"